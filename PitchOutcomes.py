@@ -1,6 +1,5 @@
 from enum import Enum
 from Zone import Zone
-import csv
 
 class PitchOutcome(Enum):
     HR = 1
@@ -18,6 +17,7 @@ class PitchOutcome(Enum):
 
 def parse_outcomes_csv(csv_path):
     """Parse outcomes.csv into the outcomes_table."""
+    import csv
     outcomes_table = []
     with open(csv_path, 'r') as file:
         reader = csv.reader(file)
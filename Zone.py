@@ -1,7 +1,6 @@
-import csv
-
 def parse_zone_csv(csv_path):
     """Parse zone.csv into a zone table where 1 = inside zone, 0 = outside zone."""
+    import csv
     zone_table = []
     with open(csv_path, 'r') as file:
         reader = csv.reader(file)
@@ -1,6 +1,8 @@
-from enum import Enum
 import random
 from game_state import GameState, PAOutcome
+from PitchOutcomes import PitchOutcome
+from engine import PitchEngine, apply_outcome, tables_fingerprint
+from sampler import Sampler, span
 
 sizes = [70, 140, 70, 110, 220, 110, 70, 140, 70]
 assert(len(sizes) == 9)
@@ -40,6 +42,70 @@ diffs = []
 
 outside_count = 0
 
+# Swing delta outcomes, from the smallest delta_table threshold to the largest
+delta_outcomes = [
+    ("homerun", PitchOutcome.HR),
+    ("triple", PitchOutcome.TRIPLE),
+    ("double", PitchOutcome.DOUBLE),
+    ("single", PitchOutcome.SINGLE),
+    ("groundball", PitchOutcome.GB),
+    ("sacfly", PitchOutcome.SF),
+    ("popout", PitchOutcome.PO),
+    ("fielderschoice", PitchOutcome.FC),
+    ("doubleplay", PitchOutcome.DP)
+]
+
+# Index into swing_outcomes for each outcome of a swing
+swing_outcome_indices = {
+    PitchOutcome.STRIKE: 0,
+    PitchOutcome.FOUL: 1,
+    PitchOutcome.HR: 2,
+    PitchOutcome.TRIPLE: 3,
+    PitchOutcome.DOUBLE: 4,
+    PitchOutcome.SINGLE: 5,
+    PitchOutcome.GB: 6,
+    PitchOutcome.SF: 7,
+    PitchOutcome.PO: 8,
+    PitchOutcome.FC: 9,
+    PitchOutcome.DP: 10
+}
+
+
+def resolve_pitch(pitch, swing) -> PitchOutcome:
+    '''
+    Returns the outcome of a pitch and swing on the 1000 slot zone (swing == -1 is a take)
+    '''
+    # Batter did not swing
+    if swing == -1:
+        if is_pitch_outside(pitch):
+            return PitchOutcome.BALL
+        return PitchOutcome.STRIKE
+
+    pitch_index = find_grid_index(pitch)
+    swing_index = find_grid_index(swing)
+
+    if pitch_index == swing_index or pitch_index in contact_neighbors[swing_index]:
+        diff = abs(pitch - swing)
+        for name, outcome in delta_outcomes:
+            if diff <= delta_table[name]:
+                return outcome
+        assert False, "Invalid swing delta" + str(diff)
+    elif pitch_index in foul_neighbors[swing_index]:
+        return PitchOutcome.FOUL
+    return PitchOutcome.STRIKE
+
+
+class Baseball1PitchAdapter(PitchEngine):
+    """Plugs the 1000 slot rules into the shared engine drivers (sim_plate_appearance, sim_game, ...)."""
+
+    def resolve(self, pitch, swing) -> PitchOutcome:
+        return resolve_pitch(pitch, swing)
+
+    def rules_key(self):
+        # The delta thresholds are module state that sensitivity.delta_sensitivity varies
+        return f"baseball1:{tables_fingerprint(sorted(delta_table.items()))}"
+
+
 def pitch(state: GameState, pitch_func, swing_func) -> bool:
     '''
     Returns true if the pitch ends the plate appearance, false otherwise
@@ -51,67 +117,15 @@ def pitch(state: GameState, pitch_func, swing_func) -> bool:
     if is_pitch_outside(pitch):
         outside_count += 1
 
-    # Batter did not swing
-    if swing == -1:
-        if is_pitch_outside(pitch):
-            balls_before = state.balls
-            state.ball()
-            if balls_before == 3:
-                return True
-        else:
-            strikes_before = state.strikes
-            state.strike()
-            if strikes_before == 2:
-                return True
-        return False
-    
-    pitch_index = find_grid_index(pitch)
-    swing_index = find_grid_index(swing)
-    
-    if pitch_index == swing_index or pitch_index in contact_neighbors[swing_index]:
-        diff = abs(pitch - swing)
-        diffs.append(diff)
-        if diff <= delta_table["homerun"]:
-            state.home_run()
-            swing_outcome_counts[2] += 1
-        elif diff <= delta_table["triple"]:
-            state.triple()
-            swing_outcome_counts[3] += 1
-        elif diff <= delta_table["double"]:
-            state.double()
-            swing_outcome_counts[4] += 1
-        elif diff <= delta_table["single"]:
-            state.single()
-            swing_outcome_counts[5] += 1
-        elif diff <= delta_table["groundball"]:
-            state.ground_ball()
-            swing_outcome_counts[6] += 1
-        elif diff <= delta_table["sacfly"]:
-            state.sac_fly()
-            swing_outcome_counts[7] += 1
-        elif diff <= delta_table["popout"]:
-            state.pop_out()
-            swing_outcome_counts[8] += 1
-        elif diff <= delta_table["fielderschoice"]:
-            state.fielders_choice()
-            swing_outcome_counts[9] += 1
-        elif diff <= delta_table["doubleplay"]:
-            state.double_play()
-            swing_outcome_counts[10] += 1
-        else:
-            assert False, "Invalid swing delta" + str(diff)
-        return True
-    elif pitch_index in foul_neighbors[swing_index]:
-        state.foul()
-        swing_outcome_counts[1] += 1
-        return False
-    else:
-        strikes_before = state.strikes
-        state.strike()
-        swing_outcome_counts[0] += 1
-        if strikes_before == 2:
-            return True
-        return False
+    outcome = resolve_pitch(pitch, swing)
+    if swing != -1:
+        swing_outcome_counts[swing_outcome_indices[outcome]] += 1
+        if outcome not in (PitchOutcome.STRIKE, PitchOutcome.FOUL):
+            diffs.append(abs(pitch - swing))
+
+    pa_count_before = state.pa_count
+    apply_outcome(state, outcome)
+    return state.pa_count > pa_count_before
 
 
 def formatAsPercent(val):
@@ -198,26 +212,27 @@ def realistic_take_swing(state: GameState):
 def random_swing_no_take(state: GameState):
     return random.randint(1, 1000)
 
-r = list(range(117, 164)) + list(range(837, 884))
+# Pitch pools are built once at import instead of on every pitch
+test1_pool = Sampler(span(117, 164) + span(837, 884))
+middle_only_pool = Sampler(span(391, 610))
+edges_only_pool = Sampler(span(218, 390) + span(611, 720))
+top_only_pool = Sampler(span(71, 210) + span(790, 930))
+corners_only_pool = Sampler(span(1, 70) + span(211, 280) + span(720, 790) + span(931, 1000))
 
 def test1(state: GameState):
-    return random.choice(r)
+    return test1_pool.draw()
 
 def middle_only(state: GameState):
-    r = list(range(391, 610))
-    return random.choice(r)
+    return middle_only_pool.draw()
 
 def edges_only(state: GameState):
-    r = list(range(218, 390)) + list(range(611, 720))
-    return random.choice(r)
+    return edges_only_pool.draw()
 
 def top_only(state: GameState):
-    r = list(range(71, 210)) + list(range(790, 930))
-    return random.choice(r)
+    return top_only_pool.draw()
 
 def corners_only(state: GameState):
-    r = list(range(1, 70)) + list(range(211, 280)) + list(range(720, 790)) + list(range(931, 1000))
-    return random.choice(r)
+    return corners_only_pool.draw()
 
 if __name__ == "__main__":
     pitch_algos = [random_pitch, middle_only, edges_only, top_only, corners_only]
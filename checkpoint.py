@@ -0,0 +1,56 @@
+import json
+import os
+import random
+import time
+
+
+def atomic_write_json(path, data):
+    """Write data as JSON so that readers only ever see the old or the new file, never a partial one."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def get_rng_state():
+    version, internal_state, gauss_next = random.getstate()
+    return [version, list(internal_state), gauss_next]
+
+
+def set_rng_state(rng_state):
+    version, internal_state, gauss_next = rng_state
+    random.setstate((version, tuple(internal_state), gauss_next))
+
+
+class Checkpointer():
+    '''
+    Periodically saves a job's accumulated counts together with the global RNG state.
+    Saves happen at loop boundaries, so resuming replays exactly the same random stream.
+    '''
+
+    def __init__(self, path, job, interval=5.0):
+        self.path = path
+        self.job = job
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """
+        Return the saved (done, counts) for this job and restore the RNG state,
+        or None if there is no checkpoint to resume from.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as file:
+            data = json.load(file)
+        if data["job"] != self.job:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different job: {data['job']}")
+        set_rng_state(data["rng"])
+        return data["done"], data["counts"]
+
+    def due(self):
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, done, counts):
+        atomic_write_json(self.path, {"job": self.job, "done": done, "counts": counts, "rng": get_rng_state()})
+        self._last_save = time.monotonic()
@@ -0,0 +1,246 @@
+import argparse
+import json
+import sys
+from PitchOutcomes import PitchOutcome
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+
+# Columnar output schemas for the commands that don't already have one in engine.py
+STANDINGS_COLUMNS = {"name": "s", "wins": "i", "losses": "i", "ties": "i", "pct": "f", "runs_for": "i", "runs_against": "i"}
+HEATMAP_COLUMNS = {"row": "i", "col": "i", "weight": "f", "avg": "f", "obp": "f", "runs_per_game": "f"}
+BENCH_COLUMNS = {"phase": "s", "calls": "i", "seconds": "f"}
+
+
+def parse_team(text):
+    """A team is PITCH,SWING (strategy names or strategy table files) or one strategy table file for both."""
+    pitch, _, swing = text.partition(",")
+    return {"pitch": pitch, "swing": swing or pitch}
+
+
+def _emit(args, data, text, schema, rows):
+    '''
+    Write the result in the requested format: text or JSON to --output (stdout by default),
+    or rows appended to the --output columnar file.
+    '''
+    if args.format == "columnar":
+        from columnar import ColumnarWriter
+        with ColumnarWriter(args.output, schema) as writer:
+            for row in rows:
+                writer.append(row)
+        return
+    output = text if args.format == "text" else json.dumps(data, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+def _progress(args):
+    if args.quiet:
+        return None
+    return lambda done, total: print(f"Completed {done}/{total}", file=sys.stderr)
+
+
+def cmd_pa_stats(args):
+    from engine import PA_STATS_COLUMNS, pa_stats_row
+    from game_state import PAOutcome
+    from jobs import normalize_job, run_job
+    from pa_model import batting_average, on_base_percentage
+
+    job = normalize_job({"kind": "pa_stats", "zone": args.zone, "outcomes": args.outcomes, "seed": args.seed,
+                         "pitch": args.pitch, "swing": args.swing, "sims": args.sims})
+    result = run_job(job, args.workers, _progress(args))
+    counts = {outcome: result[outcome.name] for outcome in PAOutcome}
+    rates = {outcome: num / args.sims for outcome, num in counts.items()}
+    lines = [f'Outcome - {outcome} - {100 * rate:.1f}%' for outcome, rate in rates.items()]
+    lines.append(f"Batting Avg.: {batting_average(rates):.3f}  OBP: {on_base_percentage(rates):.3f}")
+    _emit(args, {"job": job, "counts": result}, "\n".join(lines),
+          PA_STATS_COLUMNS, [pa_stats_row(f"{args.pitch} vs {args.swing}", counts)])
+
+
+def cmd_games(args):
+    from engine import GAME_TOTALS_COLUMNS
+    from jobs import normalize_job, run_job
+
+    job = normalize_job({"kind": "games", "zone": args.zone, "outcomes": args.outcomes, "seed": args.seed,
+                         "team_a": parse_team(args.team_a), "team_b": parse_team(args.team_b), "games": args.games})
+    totals = run_job(job, args.workers, _progress(args))
+    games = totals["games"]
+    text = "\n".join([
+        f"Team A ({args.team_a}) wins: {totals['a_wins']} ({100 * totals['a_wins'] / games:.1f}%), runs/game: {totals['a_runs'] / games:.2f}",
+        f"Team B ({args.team_b}) wins: {totals['b_wins']} ({100 * totals['b_wins'] / games:.1f}%), runs/game: {totals['b_runs'] / games:.2f}",
+        f"Ties: {totals['ties']} ({100 * totals['ties'] / games:.1f}%)"
+    ])
+    _emit(args, {"job": job, "totals": totals}, text,
+          GAME_TOTALS_COLUMNS, [dict(totals, label=f"{args.team_a} vs {args.team_b}")])
+
+
+def cmd_league(args):
+    from baseball2 import load_adapter
+    from jobs import team_strategy
+    from league import League
+
+    league = League(load_adapter(args.zone, args.outcomes).sim_pitch, args.games, args.seed, args.checkpoint)
+    for entry in args.entry:
+        name, separator, team = entry.partition("=")
+        if not separator:
+            raise ValueError(f"League entries look like NAME=PITCH,SWING, not {entry}")
+        league.register(name, team_strategy(parse_team(team)))
+    if len(league.entries) < 2:
+        raise ValueError("A league needs at least two entries")
+
+    data = {}
+    if args.bracket:
+        champion, rounds = league.run_bracket(args.workers)
+        data["champion"] = champion
+        data["rounds"] = rounds
+    else:
+        league.run(workers=args.workers)
+    standings = league.standings()
+    data["standings"] = standings
+
+    text = league.format_standings()
+    if args.bracket:
+        text += f"\nChampion: {data['champion']}"
+    _emit(args, data, text, STANDINGS_COLUMNS, standings)
+
+
+def _count_strategy(spec, role):
+    '''
+    A CountStrategy for the exact evaluator: a strategy table file, or the name of a baseball2
+    strategy that draws from a fixed pool (the same pool in every count).
+    '''
+    import baseball2
+    from count_strategy import CountStrategy
+    from jobs import STRATEGY_TABLE_EXTENSIONS, load_strategy_table
+
+    if spec.endswith(STRATEGY_TABLE_EXTENSIONS):
+        return load_strategy_table(spec)
+    pools = {"swing": baseball2.swing_pool, "smart_pitch": baseball2.smart_pitch_pool,
+             "rings": baseball2.rings_pool, "middle_swings": baseball2.middle_swings_pool}
+    if spec not in pools:
+        raise ValueError(f"{spec} isn't a strategy table file or pool strategy (choose from {', '.join(pools)})")
+    if role == "pitch":
+        return CountStrategy.constant(pitch_sampler=pools[spec])
+    return CountStrategy.constant(swing_sampler=pools[spec])
+
+
+def cmd_heatmap(args):
+    from pa_model import IncrementalEvaluator
+    from sensitivity import METRICS, cell_sensitivity, metric_values, save_heatmaps
+    from table_bundle import load_tables
+
+    replacement = PitchOutcome[args.replacement]
+    zone, outcome_table = load_tables(args.zone, args.outcomes)
+    evaluator = IncrementalEvaluator(zone, outcome_table, _count_strategy(args.pitch, "pitch"), _count_strategy(args.swing, "swing"))
+    base = metric_values(evaluator.rates())
+    grids = cell_sensitivity(evaluator, replacement)
+    if args.csv_prefix:
+        save_heatmaps(grids, args.csv_prefix)
+
+    rows = [dict({"row": row, "col": col}, **{name: grids[name][row][col] for name in grids})
+            for row in range(len(grids["weight"])) for col in range(len(grids["weight"][0]))]
+    top = sorted(rows, key=lambda cell: abs(cell["runs_per_game"]), reverse=True)[:args.top]
+    lines = ["  ".join(f"{name}: {value:.4f}" for name, value in base.items()),
+             f"Cells with the biggest runs/game change when switched to {replacement.name}:",
+             f"{'Row':>4} {'Col':>4} {'Weight':>8} " + " ".join(f"{name:>14}" for name in METRICS)]
+    for cell in top:
+        lines.append(f"{cell['row']:>4} {cell['col']:>4} {cell['weight']:>8.4f} " +
+                     " ".join(f"{cell[name]:>+14.5f}" for name in METRICS))
+    _emit(args, {"base": base, "replacement": replacement.name, "grids": grids}, "\n".join(lines), HEATMAP_COLUMNS, rows)
+
+
+def cmd_bench(args):
+    import random
+    import time
+    from baseball2 import load_adapter
+    from engine import pa_stats, sim_games
+    from jobs import resolve_strategy, team_strategy
+    from profiling import Profiler
+
+    adapter = load_adapter(args.zone, args.outcomes)
+    pitch, swing = resolve_strategy(args.pitch, "pitch"), resolve_strategy(args.swing, "swing")
+    team = team_strategy({"pitch": args.pitch, "swing": args.swing})
+    random.seed(args.seed)
+    with Profiler() as profiler:
+        start = time.perf_counter()
+        pa_stats(adapter.sim_pitch, pitch, swing, args.sims, verbose=False)
+        pa_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        sim_games(adapter.sim_pitch, args.games, team, team, verbose=False)
+        game_seconds = time.perf_counter() - start
+
+    data = dict(profiler.to_dict(), pa_per_second=args.sims / pa_seconds, games_per_second=args.games / game_seconds)
+    text = profiler.report() + f"\nPA/s: {data['pa_per_second']:.0f}  Games/s: {data['games_per_second']:.1f} (profiled)"
+    rows = [{"phase": phase, "calls": row["calls"], "seconds": row["seconds"]} for phase, row in data["phases"].items()]
+    _emit(args, data, text, BENCH_COLUMNS, rows)
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--zone", default=DEFAULT_ZONE, help="zone CSV")
+    common.add_argument("--outcomes", default=DEFAULT_OUTCOMES, help="outcome table CSV")
+    common.add_argument("--format", choices=["text", "json", "columnar"], default="text")
+    common.add_argument("--output", help="output file (required for columnar, appended to)")
+    common.add_argument("--quiet", action="store_true", help="don't report progress on stderr")
+    # Only for the commands that simulate (seeded) and can spread the work over processes (parallel)
+    seeded = argparse.ArgumentParser(add_help=False)
+    seeded.add_argument("--seed", type=int, default=0)
+    parallel = argparse.ArgumentParser(add_help=False)
+    parallel.add_argument("--workers", type=int, default=1, help="worker processes")
+
+    parser = argparse.ArgumentParser(description="FakeBaseball simulations. Strategies are baseball2 strategy "
+                                                 "names or strategy table files (.json/.csv).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("pa-stats", parents=[common, seeded, parallel], help="plate appearance outcome rates")
+    command.add_argument("--pitch", default="rings")
+    command.add_argument("--swing", default="middle_swings")
+    command.add_argument("--sims", type=int, default=10000)
+    command.set_defaults(func=cmd_pa_stats)
+
+    command = commands.add_parser("games", parents=[common, seeded, parallel], help="head to head games between two teams")
+    command.add_argument("--team-a", default="random_pitch,realistic_take_swing", help="PITCH,SWING or a strategy table file")
+    command.add_argument("--team-b", default="rings,swing", help="PITCH,SWING or a strategy table file")
+    command.add_argument("--games", type=int, default=1000)
+    command.set_defaults(func=cmd_games)
+
+    command = commands.add_parser("league", parents=[common, seeded, parallel], help="round robin or bracket between teams")
+    command.add_argument("--entry", action="append", default=[], required=True, help="NAME=PITCH,SWING (repeat for each team)")
+    command.add_argument("--games", type=int, default=1000, help="games per matchup")
+    command.add_argument("--bracket", action="store_true", help="single elimination instead of a round robin")
+    command.add_argument("--checkpoint", help="save completed matchups here and resume from it")
+    command.set_defaults(func=cmd_league)
+
+    command = commands.add_parser("heatmap", parents=[common], help="exact per-cell sensitivity of the outcome table")
+    command.add_argument("--pitch", default="rings", help="pool strategy name or strategy table file")
+    command.add_argument("--swing", default="middle_swings", help="pool strategy name or strategy table file")
+    command.add_argument("--replacement", type=str.upper, default="SINGLE", choices=[outcome.name for outcome in PitchOutcome],
+                         help="outcome each cell is switched to")
+    command.add_argument("--csv-prefix", help="also write <prefix>_<metric>.csv grids")
+    command.add_argument("--top", type=int, default=10, help="cells listed in text output")
+    command.set_defaults(func=cmd_heatmap)
+
+    command = commands.add_parser("bench", parents=[common, seeded], help="profile plate appearances and games")
+    command.add_argument("--pitch", default="rings")
+    command.add_argument("--swing", default="middle_swings")
+    command.add_argument("--sims", type=int, default=20000)
+    command.add_argument("--games", type=int, default=200)
+    command.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.format == "columnar" and not args.output:
+        parser.error("--format columnar needs --output")
+    try:
+        args.func(args)
+    except ValueError as error:
+        parser.error(str(error))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
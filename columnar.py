@@ -0,0 +1,168 @@
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b"FBCOL1\n"
+
+# Column types: 64-bit ints, doubles, or strings
+ARRAY_TYPECODES = {"i": "q", "f": "d"}
+COLUMN_TYPES = ("i", "f", "s")
+
+
+def _encode_column(values, column_type):
+    if column_type == "s":
+        data = json.dumps([str(value) for value in values]).encode()
+    else:
+        column = array(ARRAY_TYPECODES[column_type], values)
+        if sys.byteorder == "big":
+            column.byteswap()
+        data = column.tobytes()
+    return zlib.compress(data)
+
+
+def _decode_column(data, column_type):
+    data = zlib.decompress(data)
+    if column_type == "s":
+        return json.loads(data)
+    column = array(ARRAY_TYPECODES[column_type])
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+class ColumnarWriter():
+    '''
+    Buffers rows and appends them to a compressed columnar file in batches of batch_size.
+    Every batch stores each column as its own zlib block, so readers can skip the columns they don't need.
+    Opening an existing file appends to it; its schema must match. A partial batch left at the end
+    by a writer killed mid-flush is truncated first, so new batches follow the last complete one.
+    '''
+
+    def __init__(self, path, schema, batch_size=10000):
+        for name, column_type in schema.items():
+            if column_type not in COLUMN_TYPES:
+                raise ValueError(f"Unknown column type for {name}: {column_type}")
+        self.path = path
+        self.schema = dict(schema)
+        self.batch_size = batch_size
+        self._rows = {name: [] for name in self.schema}
+        self._num_rows = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            existing, end = _complete_batches(path)
+            if existing is not None and existing != self.schema:
+                raise ValueError(f"{path} has columns {existing}, not {self.schema}")
+            if end < os.path.getsize(path):
+                with open(path, 'r+b') as file:
+                    file.truncate(end)
+        else:
+            with open(path, 'wb') as file:
+                file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, row):
+        for name in self.schema:
+            self._rows[name].append(row[name])
+        self._num_rows += 1
+        if self._num_rows >= self.batch_size:
+            self.flush()
+
+    __call__ = append
+
+    def flush(self):
+        if self._num_rows == 0:
+            return
+        blocks = [_encode_column(self._rows[name], column_type) for name, column_type in self.schema.items()]
+        header = json.dumps({
+            "rows": self._num_rows,
+            "columns": [[name, column_type, len(block)] for (name, column_type), block in zip(self.schema.items(), blocks)]
+        }).encode()
+        with open(self.path, 'ab') as file:
+            file.write(struct.pack("<I", len(header)) + header + b"".join(blocks))
+        self._rows = {name: [] for name in self.schema}
+        self._num_rows = 0
+
+    def close(self):
+        self.flush()
+
+
+def _batch_headers(file):
+    '''
+    Yield the header of every complete batch, leaving the file at the start of its column blocks.
+    Reading stops at a short or partial batch (the tail of a writer killed mid-flush).
+    '''
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{file.name} is not a columnar results file")
+    file_size = os.fstat(file.fileno()).st_size
+    while True:
+        size = file.read(4)
+        if len(size) < 4:
+            return
+        size = struct.unpack("<I", size)[0]
+        data = file.read(size)
+        if len(data) < size:
+            return
+        try:
+            header = json.loads(data)
+        except ValueError:
+            return
+        if file.tell() + sum(block_size for _, _, block_size in header["columns"]) > file_size:
+            return
+        yield header
+
+
+def _complete_batches(path):
+    """The file's schema (None if it has no batches) and the offset where its last complete batch ends."""
+    schema = None
+    with open(path, 'rb') as file:
+        end = len(MAGIC)
+        for header in _batch_headers(file):
+            if schema is None:
+                schema = {name: column_type for name, column_type, _ in header["columns"]}
+            file.seek(sum(block_size for _, _, block_size in header["columns"]), os.SEEK_CUR)
+            end = file.tell()
+    return schema, end
+
+
+def read_schema(path):
+    """Column names and types of the file, or None if it has no batches yet."""
+    with open(path, 'rb') as file:
+        for header in _batch_headers(file):
+            return {name: column_type for name, column_type, _ in header["columns"]}
+    return None
+
+
+def iter_batches(path, columns=None):
+    '''
+    Lazily yield one {column: values} dict per batch, decompressing only the requested columns.
+    Int and float columns come back as arrays, string columns as lists.
+    '''
+    with open(path, 'rb') as file:
+        for header in _batch_headers(file):
+            batch = {}
+            for name, column_type, size in header["columns"]:
+                if columns is None or name in columns:
+                    batch[name] = _decode_column(file.read(size), column_type)
+                else:
+                    file.seek(size, os.SEEK_CUR)
+            yield batch
+
+
+def read_columns(path, columns=None):
+    """Read whole columns across every batch."""
+    result = {}
+    for batch in iter_batches(path, columns):
+        for name, values in batch.items():
+            if name in result:
+                result[name].extend(values)
+            else:
+                result[name] = values
+    return result
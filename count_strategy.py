@@ -0,0 +1,177 @@
+import json
+import random
+import zlib
+from engine import TeamStrategy
+from game_state import GameState
+from sampler import Sampler, rect, ring, span
+
+# Counts run from 0-0 to 3-2, indexed [balls][strikes] like swing_probabilities
+NUM_BALLS = 4
+NUM_STRIKES = 3
+COUNTS = [(balls, strikes) for balls in range(NUM_BALLS) for strikes in range(NUM_STRIKES)]
+
+REGION_SHAPES = {"rect": rect, "ring": ring, "span": span}
+
+
+def parse_distribution(spec):
+    '''
+    Build a Sampler from a JSON distribution, either
+    {"indices": [...], "weights": [...]} or {"regions": [{"rect": [x0, x1, y0, y1], "weight": 2}, ...]}.
+    A region is a "rect", "ring", "span" ([start, stop]) or a plain "indices" list.
+    '''
+    if "indices" in spec:
+        return Sampler(spec["indices"], spec.get("weights"))
+    regions = []
+    for region in spec["regions"]:
+        shapes = [shape for shape in REGION_SHAPES if shape in region]
+        if shapes:
+            indices = REGION_SHAPES[shapes[0]](*region[shapes[0]])
+        elif "indices" in region:
+            indices = region["indices"]
+        else:
+            raise ValueError(f"Region needs one of {', '.join(REGION_SHAPES)} or indices: {region}")
+        regions.append((indices, region.get("weight", 1)))
+    return Sampler.from_regions(regions)
+
+
+def _parse_count(key):
+    balls, strikes = (int(value) for value in key.split("-"))
+    if (balls, strikes) not in COUNTS:
+        raise ValueError(f"Invalid count: {key}")
+    return balls, strikes
+
+
+class CountStrategy():
+    '''
+    A strategy as data: for each of the 12 counts, the probability of swinging and the
+    pitch and swing location distributions. Every table is indexed [balls][strikes].
+    A strategy may leave the pitch or swing side empty (None) if it only covers one of them.
+    '''
+
+    def __init__(self, swing_probs, pitch_samplers, swing_samplers):
+        for table in (swing_probs, pitch_samplers, swing_samplers):
+            if len(table) != NUM_BALLS or any(len(row) != NUM_STRIKES for row in table):
+                raise ValueError("Count tables must be 4 (balls) x 3 (strikes)")
+        self.swing_probs = swing_probs
+        self.pitch_samplers = pitch_samplers
+        self.swing_samplers = swing_samplers
+
+    @classmethod
+    def constant(cls, pitch_sampler=None, swing_sampler=None, swing_prob=1.0):
+        """The same behaviour in every count."""
+        return cls([[swing_prob] * NUM_STRIKES for _ in range(NUM_BALLS)],
+                   [[pitch_sampler] * NUM_STRIKES for _ in range(NUM_BALLS)],
+                   [[swing_sampler] * NUM_STRIKES for _ in range(NUM_BALLS)])
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        Build a strategy from {"default": {...}, "counts": {"3-2": {...}}}, where each entry may have
+        "swing_prob", "pitch" and "swing" (distributions). Count entries override the default.
+        '''
+        default = data.get("default", {})
+        overrides = {_parse_count(key): value for key, value in data.get("counts", {}).items()}
+        cache = {}
+
+        def sampler(spec):
+            # Share one sampler between counts that use the same distribution
+            if spec is None:
+                return None
+            key = json.dumps(spec, sort_keys=True)
+            if key not in cache:
+                cache[key] = parse_distribution(spec)
+            return cache[key]
+
+        swing_probs = [[0.0] * NUM_STRIKES for _ in range(NUM_BALLS)]
+        pitch_samplers = [[None] * NUM_STRIKES for _ in range(NUM_BALLS)]
+        swing_samplers = [[None] * NUM_STRIKES for _ in range(NUM_BALLS)]
+        for balls, strikes in COUNTS:
+            entry = dict(default, **overrides.get((balls, strikes), {}))
+            swing_probs[balls][strikes] = float(entry.get("swing_prob", 1.0))
+            pitch_samplers[balls][strikes] = sampler(entry.get("pitch"))
+            swing_samplers[balls][strikes] = sampler(entry.get("swing"))
+        return cls(swing_probs, pitch_samplers, swing_samplers)
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        '''
+        Load a long-format CSV with the header balls,strikes,field,index,value.
+        field is swing_prob (index left blank), pitch or swing (value is that index's weight).
+        balls and strikes may be * to apply a row to every count.
+        '''
+        swing_probs = [[1.0] * NUM_STRIKES for _ in range(NUM_BALLS)]
+        weights = {"pitch": {}, "swing": {}}
+        import csv
+        with open(csv_path, 'r', newline='') as file:
+            for row in csv.DictReader(file):
+                counts = [(balls, strikes) for balls, strikes in COUNTS
+                          if row["balls"] in ("*", str(balls)) and row["strikes"] in ("*", str(strikes))]
+                if not counts:
+                    raise ValueError(f"Invalid count in {csv_path}: {row['balls']}-{row['strikes']}")
+                for count in counts:
+                    if row["field"] == "swing_prob":
+                        swing_probs[count[0]][count[1]] = float(row["value"])
+                    elif row["field"] in weights:
+                        count_weights = weights[row["field"]].setdefault(count, {})
+                        index = int(row["index"])
+                        count_weights[index] = count_weights.get(index, 0) + float(row["value"])
+                    else:
+                        raise ValueError(f"Unknown field in {csv_path}: {row['field']}")
+
+        def samplers(field):
+            cache = {}
+            table = [[None] * NUM_STRIKES for _ in range(NUM_BALLS)]
+            for (balls, strikes), count_weights in weights[field].items():
+                key = tuple(count_weights.items())
+                if key not in cache:
+                    cache[key] = Sampler(count_weights.keys(), count_weights.values())
+                table[balls][strikes] = cache[key]
+            return table
+
+        return cls(swing_probs, samplers("pitch"), samplers("swing"))
+
+    @classmethod
+    def load(cls, path):
+        """Load a strategy table from a .json or .csv file."""
+        if path.endswith(".csv"):
+            return cls.from_csv(path)
+        with open(path, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+    def to_dict(self):
+        """Explicit per-count JSON form of the strategy (distributions as indices and weights)."""
+        def spec(sampler):
+            return None if sampler is None else {"indices": sampler.values, "weights": sampler.weights}
+        return {"counts": {f"{balls}-{strikes}": {"swing_prob": self.swing_probs[balls][strikes],
+                                                  "pitch": spec(self.pitch_samplers[balls][strikes]),
+                                                  "swing": spec(self.swing_samplers[balls][strikes])}
+                           for balls, strikes in COUNTS}}
+
+    def strategy_key(self):
+        """crc32 of the strategy's tables, identifying its pitch_algo and swing_algo in checkpoints."""
+        return f"{zlib.crc32(json.dumps(self.to_dict(), sort_keys=True).encode()):08x}"
+
+    def pitch_distribution(self, balls, strikes):
+        sampler = self.pitch_samplers[balls][strikes]
+        return sampler.distribution() if sampler else None
+
+    def swing_distribution(self, balls, strikes):
+        sampler = self.swing_samplers[balls][strikes]
+        return sampler.distribution() if sampler else None
+
+    def pitch_algo(self, state: GameState):
+        sampler = self.pitch_samplers[state.balls][state.strikes]
+        if sampler is None:
+            raise ValueError(f"Strategy has no pitch distribution for {state.balls}-{state.strikes}")
+        return sampler.draw()
+
+    def swing_algo(self, state: GameState):
+        if random.random() < self.swing_probs[state.balls][state.strikes]:
+            sampler = self.swing_samplers[state.balls][state.strikes]
+            if sampler is None:
+                raise ValueError(f"Strategy has no swing distribution for {state.balls}-{state.strikes}")
+            return sampler.draw()
+        return -1
+
+    def team_strategy(self):
+        return TeamStrategy(self.pitch_algo, self.swing_algo)
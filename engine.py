@@ -0,0 +1,358 @@
+import random
+import zlib
+from game_state import GameState, PAOutcome
+from PitchOutcomes import PitchOutcome
+
+# GameState method that each pitch outcome triggers
+STATE_TRANSITIONS = {
+    PitchOutcome.HR: "home_run",
+    PitchOutcome.TRIPLE: "triple",
+    PitchOutcome.DOUBLE: "double",
+    PitchOutcome.SINGLE: "single",
+    PitchOutcome.FOUL: "foul",
+    PitchOutcome.SF: "sac_fly",
+    PitchOutcome.PO: "pop_out",
+    PitchOutcome.GB: "ground_ball",
+    PitchOutcome.FC: "fielders_choice",
+    PitchOutcome.DP: "double_play",
+    PitchOutcome.STRIKE: "strike",
+    PitchOutcome.BALL: "ball"
+}
+
+# PAOutcome recorded when a pitch outcome ends the plate appearance
+PITCH_TO_PA_OUTCOME = {
+    PitchOutcome.HR: PAOutcome.HR,
+    PitchOutcome.TRIPLE: PAOutcome.TRIPLE,
+    PitchOutcome.DOUBLE: PAOutcome.DOUBLE,
+    PitchOutcome.SINGLE: PAOutcome.SINGLE,
+    PitchOutcome.SF: PAOutcome.SF,
+    PitchOutcome.PO: PAOutcome.PO,
+    PitchOutcome.GB: PAOutcome.GB,
+    PitchOutcome.FC: PAOutcome.FC,
+    PitchOutcome.DP: PAOutcome.DP,
+    PitchOutcome.STRIKE: PAOutcome.STRIKEOUT,
+    PitchOutcome.BALL: PAOutcome.WALK
+}
+
+
+def apply_outcome(state: GameState, outcome: PitchOutcome):
+    """Advance the game state machine by one pitch outcome."""
+    if outcome not in STATE_TRANSITIONS:
+        raise ValueError(f"Unknown outcome: {outcome}")
+    getattr(state, STATE_TRANSITIONS[outcome])()
+
+
+class TeamStrategy():
+    def __init__(self, pitch_algo, swing_algo, lineup=None, pitcher=None):
+        self.pitch_algo = pitch_algo
+        self.swing_algo = swing_algo
+        # Optional batting order and pitcher (player ids), needed for per-player stats and tables
+        self.lineup = lineup
+        self.pitcher = pitcher
+
+
+
+class PitchEngine():
+    '''
+    Base class for a rule set. Subclasses only decide what a single (pitch, swing) pair produces;
+    the state machine (GameState) and the drivers below are shared by every rule set.
+    A swing of -1 means the batter took the pitch.
+    '''
+
+    def resolve(self, pitch, swing) -> PitchOutcome:
+        raise NotImplementedError
+
+    def rules_key(self):
+        """Identifies the rules for checkpoints. Engines with tables override this to fingerprint them."""
+        return type(self).__name__
+
+    def sim_pitch(self, state: GameState, pitch_algo, swing_algo) -> PitchOutcome:
+        pitch = pitch_algo(state)
+        swing = swing_algo(state)
+        outcome = self.resolve(pitch, swing)
+        apply_outcome(state, outcome)
+        return outcome
+
+
+# The installed profiling.Profiler, if any. The drivers check it on every call instead of being patched,
+# so profiling also covers code that imported them by name (e.g. the baseball2 re-exports).
+profiler = None
+
+
+def sim_plate_appearance(sim_pitch_func, state: GameState, pitch_algo, swing_algo, verbose=False):
+    """
+    Simulate a complete plate appearance (multiple pitches until it ends).
+    Returns the PAOutcome of the plate appearance.
+    """
+    if profiler is not None:
+        return profiler.plate_appearance(_play_plate_appearance, sim_pitch_func, state, pitch_algo, swing_algo, verbose)
+    return _play_plate_appearance(sim_pitch_func, state, pitch_algo, swing_algo, verbose)
+
+def _play_plate_appearance(sim_pitch_func, state: GameState, pitch_algo, swing_algo, verbose):
+    initial_pa_count = state.pa_count
+    side = 0 if state.top else 1
+    initial_runs = state.score[side]
+    pitches = 0
+    while True:
+        outcome = sim_pitch_func(state, pitch_algo, swing_algo)
+        pitches += 1
+
+        # Every way a plate appearance can end (hit, out, walk, strikeout) goes through GameState._end_pa
+        if state.pa_count > initial_pa_count:
+            pa_outcome = PITCH_TO_PA_OUTCOME[outcome]
+            if verbose:
+                print(f"PAOutcome: {pa_outcome.name}")
+            if state.lineups:
+                state.end_batter(side, pa_outcome, state.score[side] - initial_runs, pitches)
+            return pa_outcome
+
+def sim_game(sim_pitch_func, strategyA: TeamStrategy, strategyB: TeamStrategy, aHome: bool = True, verbose=False, stats=None):
+    """
+    Simulate a full game (9+ innings).
+    Uses default algorithms if none provided.
+    Ends in the middle of an inning if home team is winning (9th inning or later).
+    Continues to extra innings if tied after 9.
+    Ends in a tie if still tied after 18 innings.
+    If both strategies have lineups, batting orders are tracked and per-player lines go into stats (a StatBook).
+    """
+    if profiler is not None:
+        return profiler.game(_play_game, sim_pitch_func, strategyA, strategyB, aHome, verbose, stats)
+    return _play_game(sim_pitch_func, strategyA, strategyB, aHome, verbose, stats)
+
+def _play_game(sim_pitch_func, strategyA: TeamStrategy, strategyB: TeamStrategy, aHome, verbose, stats):
+    homeStrategy = strategyA if aHome else strategyB
+    awayStrategy = strategyB if aHome else strategyA
+
+    lineups = None
+    if awayStrategy.lineup and homeStrategy.lineup:
+        lineups = [awayStrategy.lineup, homeStrategy.lineup]
+    state = GameState(lineups, stats, [awayStrategy.pitcher, homeStrategy.pitcher])
+    
+    # Sim regular innings
+    while state.inning < 10:
+        if verbose:
+            print(f"Top of {state.inning}")
+            print(f"Current score: {state.score}")
+        while state.top:
+            sim_plate_appearance(sim_pitch_func, state, homeStrategy.pitch_algo, awayStrategy.swing_algo, verbose)
+
+        if verbose:
+            print(f"Bottom of {state.inning}")
+            print(f"Current score: {state.score}")
+        while not state.top:
+            sim_plate_appearance(sim_pitch_func, state, awayStrategy.pitch_algo, homeStrategy.swing_algo, verbose)
+            if state.inning == 9 and state.score[1] > state.score[0]:
+                break
+
+    # Sim extra innings
+    if state.score[0] == state.score[1]:
+        while state.inning <= 18:
+            if verbose:
+                print(f"Top of {state.inning}")
+                print(f"Current score: {state.score}")
+            while state.top:
+                sim_plate_appearance(sim_pitch_func, state, homeStrategy.pitch_algo, awayStrategy.swing_algo, verbose)
+
+            if verbose:
+                print(f"Bottom of {state.inning}")
+                print(f"Current score: {state.score}")
+            while not state.top:
+                sim_plate_appearance(sim_pitch_func, state, awayStrategy.pitch_algo, homeStrategy.swing_algo, verbose)
+            if state.score[1] > state.score[0]:
+                break
+        
+    # Print game results
+    if verbose:
+        print(f"Plate appearances: {state.pa_count}")
+        print(f"Final score: {state.score}")
+        print(f"Innings played: {state.inning - 1}")
+    
+    return state
+
+
+def algo_name(algo):
+    """Name a strategy function for labels."""
+    return getattr(algo, "__name__", type(algo).__name__)
+
+
+def algo_key(algo):
+    '''
+    Identify a strategy function for checkpoints. Methods of an object with a strategy_key (like a
+    CountStrategy's pitch_algo) include it, so strategies built from different tables don't match.
+    Lambdas have no name to tell them apart, so they can't be checkpointed.
+    '''
+    owner = getattr(algo, "__self__", None)
+    if owner is not None and hasattr(owner, "strategy_key"):
+        return f"{algo_name(algo)}@{owner.strategy_key()}"
+    name = algo_name(algo)
+    if name == "<lambda>":
+        raise ValueError("Can't checkpoint a lambda strategy, define it with def so it has a name")
+    return name
+
+
+def tables_fingerprint(*tables):
+    """crc32 of the contents of some tables (lists of rows), for rules_key."""
+    return f"{zlib.crc32(repr(tables).encode()):08x}"
+
+
+def rules_key(sim_pitch_func):
+    """Identify the rules behind sim_pitch_func: the engine's rules_key when it is a PitchEngine's sim_pitch."""
+    engine = getattr(sim_pitch_func, "__self__", None)
+    return engine.rules_key() if isinstance(engine, PitchEngine) else algo_key(sim_pitch_func)
+
+
+def _job_name(kind, count, sim_pitch_func, job_key, *algos):
+    '''
+    Checkpoint identity of a job: its size, the rules it runs on (see rules_key), the caller's job_key (e.g. the seed) and the strategies.
+    '''
+    parts = [kind, str(count), rules_key(sim_pitch_func)] + ([str(job_key)] if job_key is not None else [])
+    return ":".join(parts + [algo_key(algo) for algo in algos])
+
+
+# Per-game rows passed to the sim_games recorder, as columnar.ColumnarWriter column types
+GAME_COLUMNS = {"game": "i", "a_home": "i", "a_score": "i", "b_score": "i", "innings": "i", "pa_count": "i"}
+
+# sim_games totals, with a label for the matchup
+GAME_TOTALS_COLUMNS = {"label": "s", "games": "i", "a_wins": "i", "b_wins": "i", "ties": "i", "a_runs": "i", "b_runs": "i"}
+
+# Per-run rows made by pa_stats_row
+PA_STATS_COLUMNS = dict({"label": "s", "sims": "i"}, **{outcome.name: "i" for outcome in PAOutcome})
+
+
+def sim_games(sim_pitch_func, num_games, strategyA: TeamStrategy, strategyB: TeamStrategy, verbose=True,
+              checkpoint_path=None, resume=False, checkpoint_interval=5.0, recorder=None, stats=None, job_key=None):
+    """
+    Simulate multiple games and return the win/tie and run totals for each team.
+    If checkpoint_path is given, progress is saved every checkpoint_interval seconds and
+    resume=True continues from the last save with the same result as an uninterrupted run.
+    A checkpoint only resumes the same job: same rules and tables, strategies, size and job_key
+    (anything else that identifies the run, like its seed).
+    If recorder is given it is called with a GAME_COLUMNS row after every game. It can't be combined with
+    resume: games played after the last checkpoint are replayed on resume, and their rows (already flushed
+    when the run was killed) would be recorded twice.
+    stats (a StatBook) accumulates season lines for strategies with lineups.
+    """    
+    if recorder and resume:
+        raise ValueError("sim_games can't resume with a recorder, replayed games would be recorded twice")
+    totals = {"games": num_games, "a_wins": 0, "b_wins": 0, "ties": 0, "a_runs": 0, "b_runs": 0}
+    start = 0
+
+    checkpointer = None
+    if checkpoint_path:
+        from checkpoint import Checkpointer
+        checkpointer = Checkpointer(checkpoint_path, _job_name("sim_games", num_games, sim_pitch_func, job_key, strategyA.pitch_algo,
+                                    strategyA.swing_algo, strategyB.pitch_algo, strategyB.swing_algo), checkpoint_interval)
+        saved = checkpointer.load() if resume else None
+        if saved:
+            start, totals = saved
+            season = totals.pop("stats", None)
+            if stats is not None and season is not None:
+                stats.set_columns(season)
+
+    def checkpoint_counts():
+        return dict(totals, stats=stats.columns()) if stats is not None else totals
+    
+    for i in range(start, num_games):
+        if checkpointer and checkpointer.due():
+            checkpointer.save(i, checkpoint_counts())
+
+        a_home = random.random() > 0.5
+        state = sim_game(sim_pitch_func, strategyA, strategyB, a_home, stats=stats)
+        a_score = state.score[1] if a_home else state.score[0]
+        b_score = state.score[0] if a_home else state.score[1]
+        
+        # Track wins and ties
+        if a_score > b_score:
+            totals["a_wins"] += 1
+        elif b_score > a_score:
+            totals["b_wins"] += 1
+        else:
+            totals["ties"] += 1
+
+        totals["a_runs"] += a_score
+        totals["b_runs"] += b_score
+
+        if recorder:
+            # A finished half inning has already moved on to the next inning
+            innings = state.inning - 1 if state.top else state.inning
+            recorder({"game": i, "a_home": int(a_home), "a_score": a_score, "b_score": b_score,
+                      "innings": innings, "pa_count": state.pa_count})
+        
+        # Print progress every 100 games
+        if verbose and (i + 1) % 100 == 0:
+            print(f"Completed {i + 1}/{num_games} games")
+
+    if checkpointer:
+        checkpointer.save(num_games, checkpoint_counts())
+
+    # Calculate runs per 9 innings
+    # avg_runs_team1_per_9 = (total_runs_team1 / total_innings_team1) * 9 if total_innings_team1 > 0 else 0
+    # avg_runs_team2_per_9 = (total_runs_team2 / total_innings_team2) * 9 if total_innings_team2 > 0 else 0
+
+    if verbose:
+        a_wins, b_wins, ties = totals["a_wins"], totals["b_wins"], totals["ties"]
+
+        # Calculate win rates
+        a_win_rate = (a_wins / num_games) * 100
+        b_win_rate = (b_wins / num_games) * 100
+        tie_rate = (ties / num_games) * 100
+
+        print(f"\nResults after {num_games} games:")
+        # print(f"Average runs per 9 innings - Team 1 (away): {avg_runs_team1_per_9:.2f}")
+        # print(f"Average runs per 9 innings - Team 2 (home): {avg_runs_team2_per_9:.2f}")
+        print(f"Team A win rate: {a_win_rate:.1f}% ({a_wins}/{num_games})")
+        print(f"Team B win rate: {b_win_rate:.1f}% ({b_wins}/{num_games})")
+        print(f"Tie rate: {tie_rate:.1f}% ({ties}/{num_games})")
+
+    return totals
+
+
+def pa_stats(sim_pitch_func, pitch_algo, swing_algo, sims = 10000, verbose=True,
+             checkpoint_path=None, resume=False, checkpoint_interval=5.0, job_key=None):
+    """
+    Simulate sims fresh plate appearances and return the count of each PAOutcome.
+    Checkpointing works the same way as in sim_games.
+    """
+    counts = {outcome: 0 for outcome in PAOutcome}
+    start = 0
+
+    checkpointer = None
+    if checkpoint_path:
+        from checkpoint import Checkpointer
+        checkpointer = Checkpointer(checkpoint_path, _job_name("pa_stats", sims, sim_pitch_func, job_key, pitch_algo, swing_algo), checkpoint_interval)
+        saved = checkpointer.load() if resume else None
+        if saved:
+            start, saved_counts = saved
+            counts = {outcome: saved_counts[outcome.name] for outcome in PAOutcome}
+
+    for i in range(start, sims):
+        if checkpointer and checkpointer.due():
+            checkpointer.save(i, {outcome.name: num for outcome, num in counts.items()})
+        counts[sim_plate_appearance(sim_pitch_func, GameState(), pitch_algo=pitch_algo, swing_algo=swing_algo)] += 1
+
+    if checkpointer:
+        checkpointer.save(sims, {outcome.name: num for outcome, num in counts.items()})
+    
+    if verbose:
+        for outcome, num in counts.items():
+            rate = 100 * (num / sims)
+            print(f'Outcome - {outcome} - {rate:.1f}%')
+
+    return counts
+
+
+def pa_stats_row(label, counts):
+    """Turn pa_stats counts into a PA_STATS_COLUMNS row."""
+    return dict({"label": label, "sims": sum(counts.values())}, **{outcome.name: num for outcome, num in counts.items()})
+
+
+def head_to_head(runs, sims=10000, seed=0):
+    '''
+    Run pa_stats for several engines on the same random stream.
+    runs is a list of (name, sim_pitch_func, pitch_algo, swing_algo); returns {name: counts}.
+    '''
+    results = {}
+    for name, sim_pitch_func, pitch_algo, swing_algo in runs:
+        random.seed(seed)
+        results[name] = pa_stats(sim_pitch_func, pitch_algo, swing_algo, sims, verbose=False)
+    return results
@@ -16,7 +16,12 @@ class PAOutcome(Enum):
 
 
 class GameState:
-    def __init__(self):
+    def __init__(self, lineups=None, stats=None, pitchers=None):
+        '''
+        lineups is an optional [away, home] pair of batting orders (lists of player ids),
+        and pitchers the matching [away, home] pitcher ids.
+        When lineups are given, stats (a StatBook) receives a line for every finished plate appearance.
+        '''
         self.inning = 1
         self.top = True
         self.score = [0, 0]
@@ -26,6 +31,28 @@ class GameState:
         self.bases = [False, False, False]
         self.outcomes = {outcome: 0 for outcome in PAOutcome}
         self.pa_count = 0
+        self.lineups = lineups
+        self.stats = stats
+        self.pitchers = pitchers
+        self.batting_order = [0, 0]
+
+    def current_batter(self):
+        side = 0 if self.top else 1
+        lineup = self.lineups[side]
+        return lineup[self.batting_order[side] % len(lineup)]
+
+    def current_pitcher(self):
+        return self.pitchers[1 if self.top else 0]
+
+    def end_batter(self, side, outcome: PAOutcome, runs, pitches):
+        '''
+        Record the plate appearance that just finished for the batting side and bring up the next batter.
+        side is passed in because the last out has already flipped self.top.
+        '''
+        lineup = self.lineups[side]
+        if self.stats is not None:
+            self.stats.record_pa(lineup[self.batting_order[side] % len(lineup)], outcome, runs, pitches)
+        self.batting_order[side] += 1
 
     def _change_inning(self):
         self.bases = [False, False, False]
@@ -0,0 +1,165 @@
+import random
+from functools import lru_cache
+from baseball2 import get_strategy, load_adapter
+from engine import TeamStrategy, pa_stats, sim_games
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES, file_fingerprint
+
+# Work units sent to the pool; progress is reported once per finished chunk
+CHUNK_SIZES = {"pa_stats": 5000, "games": 100}
+
+STRATEGY_TABLE_EXTENSIONS = (".json", ".csv")
+
+
+def _fingerprint(path):
+    try:
+        return file_fingerprint(path)
+    except OSError as error:
+        raise ValueError(f"Can't read {path}: {error}")
+
+
+def load_strategy_table(path):
+    """Load a strategy table file once per process and reuse it on later calls, until the file is edited."""
+    return _load_strategy_table(path, _fingerprint(path))
+
+
+@lru_cache(maxsize=32)
+def _load_strategy_table(path, fingerprint):
+    from count_strategy import CountStrategy
+    try:
+        return CountStrategy.load(path)
+    except OSError as error:
+        raise ValueError(f"Can't read strategy table {path}: {error}")
+
+
+def resolve_strategy(spec, role):
+    '''
+    A strategy function for role ("pitch" or "swing"): either a baseball2 strategy name,
+    or a strategy table file (see CountStrategy.load), which provides both roles.
+    '''
+    if isinstance(spec, str) and spec.endswith(STRATEGY_TABLE_EXTENSIONS):
+        return getattr(load_strategy_table(spec), f"{role}_algo")
+    return get_strategy(spec)
+
+
+def _positive_int(spec, key, default):
+    value = spec.get(key, default)
+    if not isinstance(value, int) or value <= 0:
+        raise ValueError(f"{key} must be a positive integer")
+    return value
+
+
+def _strategy(spec, key, role):
+    value = spec.get(key)
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a strategy name or strategy table file")
+    resolve_strategy(value, role)
+    return value
+
+
+def _path(spec, key, default):
+    value = spec.get(key, default)
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a file path")
+    return value
+
+
+def _team(spec, key):
+    team = spec.get(key)
+    if not isinstance(team, dict):
+        raise ValueError(f"{key} must be an object with pitch and swing strategies")
+    return {"pitch": _strategy(team, "pitch", "pitch"), "swing": _strategy(team, "swing", "swing")}
+
+
+def team_strategy(team) -> TeamStrategy:
+    return TeamStrategy(resolve_strategy(team["pitch"], "pitch"), resolve_strategy(team["swing"], "swing"))
+
+
+def normalize_job(spec):
+    """
+    Validate a job request and fill in defaults. Two requests that normalize to the same
+    dict produce the same result, which is what deduplication and the result cache rely on.
+    Strategies are baseball2 strategy names or strategy table files. The contents of every file
+    the job reads are fingerprinted into the job, so editing a file makes it a different job.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Job must be a JSON object")
+    seed = spec.get("seed", 0)
+    if not isinstance(seed, int):
+        raise ValueError("seed must be an integer")
+    job = {
+        "kind": spec.get("kind", "pa_stats"),
+        "zone": _path(spec, "zone", DEFAULT_ZONE),
+        "outcomes": _path(spec, "outcomes", DEFAULT_OUTCOMES),
+        "seed": seed
+    }
+    if job["kind"] == "pa_stats":
+        job["pitch"] = _strategy(spec, "pitch", "pitch")
+        job["swing"] = _strategy(spec, "swing", "swing")
+        job["sims"] = _positive_int(spec, "sims", 10000)
+        strategies = [job["pitch"], job["swing"]]
+    elif job["kind"] == "games":
+        job["team_a"] = _team(spec, "team_a")
+        job["team_b"] = _team(spec, "team_b")
+        job["games"] = _positive_int(spec, "games", 1000)
+        strategies = list(job["team_a"].values()) + list(job["team_b"].values())
+    else:
+        raise ValueError(f"Unknown job kind: {job['kind']}")
+    paths = [job["zone"], job["outcomes"]] + [path for path in strategies if path.endswith(STRATEGY_TABLE_EXTENSIONS)]
+    job["fingerprints"] = {path: _fingerprint(path) for path in paths}
+    return job
+
+
+def job_chunks(job):
+    total = job["sims"] if job["kind"] == "pa_stats" else job["games"]
+    size = CHUNK_SIZES[job["kind"]]
+    return [(index, min(size, total - start)) for index, start in enumerate(range(0, total, size))]
+
+
+def run_chunk(job, index, num):
+    '''
+    Run one chunk of a job in a pool worker. Returns (num, counts).
+    Each chunk has its own seed, so the merged result doesn't depend on the number of workers.
+    '''
+    random.seed(f"{job['seed']}:{index}")
+    adapter = load_adapter(job["zone"], job["outcomes"])
+    if job["kind"] == "pa_stats":
+        counts = pa_stats(adapter.sim_pitch, resolve_strategy(job["pitch"], "pitch"),
+                          resolve_strategy(job["swing"], "swing"), num, verbose=False)
+        return num, {outcome.name: n for outcome, n in counts.items()}
+    return num, sim_games(adapter.sim_pitch, num, team_strategy(job["team_a"]), team_strategy(job["team_b"]), verbose=False)
+
+
+def _run_chunk_task(task):
+    return run_chunk(*task)
+
+
+def run_job(job, workers=1, progress=None):
+    '''
+    Run a normalized job to completion, in this process or on a pool of workers, and return the
+    merged counts. Chunks are seeded like in the service, so the result is the same either way.
+    progress, if given, is called with (done, total) after every chunk.
+    '''
+    chunks = job_chunks(job)
+    total = sum(num for _, num in chunks)
+    tasks = [(job, index, num) for index, num in chunks]
+    result = {}
+    done = 0
+
+    def merge(chunk_result):
+        nonlocal done
+        num, counts = chunk_result
+        for name, value in counts.items():
+            result[name] = result.get(name, 0) + value
+        done += num
+        if progress:
+            progress(done, total)
+
+    if workers > 1:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            for chunk_result in pool.imap_unordered(_run_chunk_task, tasks):
+                merge(chunk_result)
+    else:
+        for task in tasks:
+            merge(_run_chunk_task(task))
+    return result
@@ -0,0 +1,188 @@
+import json
+import os
+import random
+from multiprocessing import Pool
+from engine import TeamStrategy, algo_key, rules_key, sim_games
+from checkpoint import atomic_write_json
+
+
+def _matchup_seed(seed, a_name, b_name):
+    """Derive a stable per-matchup seed so results don't depend on run order."""
+    return random.Random(f"{seed}:{a_name}:{b_name}").getrandbits(32)
+
+
+def _entry_identity(strategy: TeamStrategy):
+    return [algo_key(strategy.pitch_algo), algo_key(strategy.swing_algo)]
+
+
+_worker_sim_pitch_func = None
+
+def _init_worker(sim_pitch_func):
+    # Tables are sent once per worker process instead of once per matchup
+    global _worker_sim_pitch_func
+    _worker_sim_pitch_func = sim_pitch_func
+
+def _run_matchup(task):
+    a_name, b_name, strategyA, strategyB, num_games, seed = task
+    random.seed(seed)
+    result = sim_games(_worker_sim_pitch_func, num_games, strategyA, strategyB, verbose=False)
+    return a_name, b_name, result
+
+
+class League():
+    """
+    A set of named TeamStrategy entries that can be played against each other.
+    Completed matchups are saved to checkpoint_path (if given) so an interrupted run resumes.
+    """
+
+    def __init__(self, sim_pitch_func, games_per_matchup=1000, seed=0, checkpoint_path=None):
+        self.sim_pitch_func = sim_pitch_func
+        self.games_per_matchup = games_per_matchup
+        self.seed = seed
+        self.checkpoint_path = checkpoint_path
+        self.entries = {}
+        self.results = {}
+        # Strategy identity of every entry the checkpointed results were played with
+        self._checkpoint_entries = {}
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self._load_checkpoint()
+
+    def register(self, name, strategy: TeamStrategy):
+        if name in self.entries:
+            raise ValueError(f"Duplicate league entry: {name}")
+        identity = _entry_identity(strategy)
+        if self._checkpoint_entries.get(name, identity) != identity:
+            raise ValueError(f"Checkpoint {self.checkpoint_path} has results for a different {name}: "
+                             f"{'/'.join(self._checkpoint_entries[name])}")
+        self.entries[name] = strategy
+
+    def round_robin(self):
+        """Every entry plays every other entry once."""
+        names = list(self.entries)
+        return [(names[i], names[j]) for i in range(len(names)) for j in range(i + 1, len(names))]
+
+    def bracket_round(self, names):
+        '''
+        Pair seeds for one round of a single elimination bracket (best vs worst).
+        Returns the pairs and the top seed that gets a bye when the field is odd.
+        '''
+        names = list(names)
+        bye = names.pop(0) if len(names) % 2 == 1 else None
+        pairs = [(names[i], names[len(names) - 1 - i]) for i in range(len(names) // 2)]
+        return pairs, bye
+
+    def run(self, schedule=None, workers=1):
+        """
+        Play every matchup in schedule (round robin by default) that isn't already completed.
+        Returns the results of the scheduled matchups keyed by (a_name, b_name).
+        """
+        if schedule is None:
+            schedule = self.round_robin()
+        pending = [(a, b) for a, b in schedule if (a, b) not in self.results]
+        tasks = [(a, b, self.entries[a], self.entries[b], self.games_per_matchup, _matchup_seed(self.seed, a, b))
+                 for a, b in pending]
+
+        if workers == 1:
+            # Matchups reseed the global RNG, put the caller's state back afterwards
+            rng_state = random.getstate()
+            try:
+                _init_worker(self.sim_pitch_func)
+                for task in tasks:
+                    self._record(*_run_matchup(task))
+            finally:
+                random.setstate(rng_state)
+        elif tasks:
+            with Pool(workers, initializer=_init_worker, initargs=(self.sim_pitch_func,)) as pool:
+                for a_name, b_name, result in pool.imap_unordered(_run_matchup, tasks):
+                    self._record(a_name, b_name, result)
+
+        return {(a, b): self.results[(a, b)] for a, b in schedule}
+
+    def run_bracket(self, workers=1):
+        """
+        Play a single elimination bracket seeded in registration order.
+        Returns the champion and the list of rounds played.
+        """
+        remaining = list(self.entries)
+        rounds = []
+        while len(remaining) > 1:
+            pairs, bye = self.bracket_round(remaining)
+            results = self.run(pairs, workers)
+            rounds.append(pairs)
+            # Ties on wins go to the higher seed (listed first)
+            winners = [a if results[(a, b)]["a_wins"] >= results[(a, b)]["b_wins"] else b for a, b in pairs]
+            remaining = ([bye] if bye else []) + winners
+        return remaining[0], rounds
+
+    def _record(self, a_name, b_name, result):
+        self.results[(a_name, b_name)] = result
+        if self.checkpoint_path:
+            self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        data = {
+            "games_per_matchup": self.games_per_matchup,
+            "seed": self.seed,
+            "rules": rules_key(self.sim_pitch_func),
+            "entries": dict(self._checkpoint_entries, **{name: _entry_identity(strategy) for name, strategy in self.entries.items()}),
+            "results": [[a, b, result] for (a, b), result in self.results.items()]
+        }
+        atomic_write_json(self.checkpoint_path, data)
+
+    def _load_checkpoint(self):
+        with open(self.checkpoint_path, 'r') as file:
+            data = json.load(file)
+        if data["games_per_matchup"] != self.games_per_matchup or data["seed"] != self.seed:
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was written with different league settings")
+        if data.get("rules") != rules_key(self.sim_pitch_func):
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was played with different rules: {data.get('rules')}")
+        self._checkpoint_entries = {name: list(identity) for name, identity in data.get("entries", {}).items()}
+        self.results = {(a, b): result for a, b, result in data["results"]}
+
+    def standings(self):
+        """Return a list of standings rows sorted by win percentage (ties count as half a win)."""
+        table = {name: {"name": name, "wins": 0, "losses": 0, "ties": 0, "runs_for": 0, "runs_against": 0}
+                 for name in self.entries}
+        for (a, b), result in self.results.items():
+            if a not in table or b not in table:
+                continue
+            table[a]["wins"] += result["a_wins"]
+            table[a]["losses"] += result["b_wins"]
+            table[b]["wins"] += result["b_wins"]
+            table[b]["losses"] += result["a_wins"]
+            table[a]["ties"] += result["ties"]
+            table[b]["ties"] += result["ties"]
+            table[a]["runs_for"] += result["a_runs"]
+            table[a]["runs_against"] += result["b_runs"]
+            table[b]["runs_for"] += result["b_runs"]
+            table[b]["runs_against"] += result["a_runs"]
+
+        for row in table.values():
+            games = row["wins"] + row["losses"] + row["ties"]
+            row["pct"] = (row["wins"] + 0.5 * row["ties"]) / games if games else 0.0
+        return sorted(table.values(), key=lambda row: row["pct"], reverse=True)
+
+    def win_matrix(self):
+        '''
+        Return matrix[i][j] = probability that entry i beats entry j (ties count as half),
+        with entries in registration order. Unplayed matchups are None.
+        '''
+        names = list(self.entries)
+        matrix = [[None for _ in names] for _ in names]
+        for (a, b), result in self.results.items():
+            if a not in self.entries or b not in self.entries:
+                continue
+            i, j = names.index(a), names.index(b)
+            a_prob = (result["a_wins"] + 0.5 * result["ties"]) / result["games"]
+            matrix[i][j] = a_prob
+            matrix[j][i] = 1 - a_prob
+        return matrix
+
+    def format_standings(self):
+        lines = [f"{'Team':<20} {'W':>7} {'L':>7} {'T':>5} {'Pct':>6} {'RF':>8} {'RA':>8}"]
+        for row in self.standings():
+            lines.append(f"{row['name']:<20} {row['wins']:>7} {row['losses']:>7} {row['ties']:>5} {row['pct']:>6.3f} {row['runs_for']:>8} {row['runs_against']:>8}")
+        return "\n".join(lines)
+
+    def print_standings(self):
+        print(self.format_standings())
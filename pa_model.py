@@ -0,0 +1,178 @@
+from count_strategy import COUNTS, NUM_BALLS, NUM_STRIKES, CountStrategy
+from game_state import PAOutcome
+from engine import PITCH_TO_PA_OUTCOME
+from PitchOutcomes import PitchOutcome, OutcomeTable
+from Zone import Zone
+
+# Pitch outcomes that keep the plate appearance going (BALL and STRIKE only end it on ball four / strike three)
+CONTINUING_OUTCOMES = (PitchOutcome.BALL, PitchOutcome.STRIKE, PitchOutcome.FOUL)
+HIT_OUTCOMES = (PAOutcome.HR, PAOutcome.TRIPLE, PAOutcome.DOUBLE, PAOutcome.SINGLE)
+
+
+def batting_average(rates):
+    """Same definitions as baseball.print_pa_outcomes: walks are the only PAs that aren't at bats."""
+    return sum(rates[outcome] for outcome in HIT_OUTCOMES) / (1 - rates[PAOutcome.WALK])
+
+
+def on_base_percentage(rates):
+    return sum(rates[outcome] for outcome in HIT_OUTCOMES) + rates[PAOutcome.WALK]
+
+
+def offset_masses(zone: Zone, outcome_table: OutcomeTable, pitch_distribution, swing_distribution):
+    '''
+    Probability that a swing lands on each outcome table cell for the given pitch and swing
+    distributions ([(index, probability)]). Returns ({(row, col): mass}, miss_mass) where
+    miss_mass is the probability that the swing is off the table entirely (a whiff).
+    '''
+    center_x, center_y = outcome_table.outcome_table_center
+    rows, cols = len(outcome_table.outcome_table), len(outcome_table.outcome_table[0])
+    masses = {}
+    miss = 0.0
+    swings = [(zone.index_to_position(index), prob) for index, prob in swing_distribution]
+    for pitch, pitch_prob in pitch_distribution:
+        pitch_x, pitch_y = zone.index_to_position(pitch)
+        for (swing_x, swing_y), swing_prob in swings:
+            col = pitch_x - swing_x + center_x
+            row = pitch_y - swing_y + center_y
+            if 0 <= col < cols and 0 <= row < rows:
+                masses[(row, col)] = masses.get((row, col), 0.0) + pitch_prob * swing_prob
+            else:
+                miss += pitch_prob * swing_prob
+    return masses, miss
+
+
+class IncrementalEvaluator():
+    '''
+    Exact plate appearance outcome rates for fixed pitching and batting CountStrategies, computed
+    through the balls/strikes Markov chain instead of by simulation.
+    The probability of each count landing a swing on each outcome table cell is computed once,
+    so set_cell only moves that cell's mass between outcomes (12 updates) and re-solves the 12 count chain.
+    '''
+
+    def __init__(self, zone: Zone, outcome_table: OutcomeTable, pitching: CountStrategy, batting: CountStrategy):
+        self.table = [list(row) for row in outcome_table.outcome_table]
+        self.cell_masses = {}
+        self.outcome_masses = {}
+        cache = {}
+        for balls, strikes in COUNTS:
+            pitch_sampler = pitching.pitch_samplers[balls][strikes]
+            swing_sampler = batting.swing_samplers[balls][strikes]
+            swing_prob = batting.swing_probs[balls][strikes]
+            if pitch_sampler is None or (swing_prob > 0 and swing_sampler is None):
+                raise ValueError(f"Strategies need pitch and swing distributions for {balls}-{strikes}")
+
+            masses = {outcome: 0.0 for outcome in PitchOutcome}
+            for pitch, prob in pitch_sampler.distribution():
+                masses[PitchOutcome.BALL if zone.is_outside(pitch) else PitchOutcome.STRIKE] += (1 - swing_prob) * prob
+
+            cells = {}
+            if swing_prob > 0:
+                key = (id(pitch_sampler), id(swing_sampler))
+                if key not in cache:
+                    cache[key] = offset_masses(zone, outcome_table, pitch_sampler.distribution(), swing_sampler.distribution())
+                offsets, miss = cache[key]
+                masses[PitchOutcome.STRIKE] += swing_prob * miss
+                for (row, col), mass in offsets.items():
+                    cells[(row, col)] = swing_prob * mass
+                    masses[PitchOutcome(self.table[row][col])] += swing_prob * mass
+
+            self.cell_masses[(balls, strikes)] = cells
+            self.outcome_masses[(balls, strikes)] = masses
+
+        self._solve()
+
+    def _solve(self):
+        '''
+        Walk the counts from 0-0 outwards, pushing the probability of reaching each count on to the
+        next counts and PA outcomes. Fouls with two strikes loop back to the same count, which is
+        resolved by dividing the other outcomes by (1 - foul probability).
+        '''
+        reach = {count: 0.0 for count in COUNTS}
+        reach[(0, 0)] = 1.0
+        self.visits = {}
+        self._rates = {outcome: 0.0 for outcome in PAOutcome}
+        for balls, strikes in sorted(COUNTS, key=sum):
+            masses = self.outcome_masses[(balls, strikes)]
+            visits = reach[(balls, strikes)]
+            if strikes == NUM_STRIKES - 1:
+                if masses[PitchOutcome.FOUL] >= 1.0:
+                    raise ValueError(f"Plate appearances never end at {balls}-{strikes}, every pitch is fouled off")
+                visits /= 1 - masses[PitchOutcome.FOUL]
+            self.visits[(balls, strikes)] = visits
+
+            for outcome, mass in masses.items():
+                if mass == 0.0:
+                    continue
+                if outcome == PitchOutcome.BALL:
+                    if balls + 1 == NUM_BALLS:
+                        self._rates[PAOutcome.WALK] += visits * mass
+                    else:
+                        reach[(balls + 1, strikes)] += visits * mass
+                elif outcome == PitchOutcome.STRIKE or (outcome == PitchOutcome.FOUL and strikes < NUM_STRIKES - 1):
+                    if strikes + 1 == NUM_STRIKES:
+                        self._rates[PAOutcome.STRIKEOUT] += visits * mass
+                    else:
+                        reach[(balls, strikes + 1)] += visits * mass
+                elif outcome != PitchOutcome.FOUL:
+                    self._rates[PITCH_TO_PA_OUTCOME[outcome]] += visits * mass
+        self._dirty = False
+
+    def cell_weight(self, row, col):
+        """Expected number of swings per PA that land on the cell, i.e. the cell's linear weight."""
+        return sum(self.visits[count] * cells.get((row, col), 0.0) for count, cells in self.cell_masses.items())
+
+    def set_cell(self, row, col, outcome: PitchOutcome):
+        old = PitchOutcome(self.table[row][col])
+        outcome = PitchOutcome(outcome)
+        if old == outcome:
+            return
+        self.table[row][col] = outcome.value
+        if not self._dirty and old not in CONTINUING_OUTCOMES and outcome not in CONTINUING_OUTCOMES:
+            # Swapping one PA ending for another doesn't change how often each count is reached
+            weight = self.cell_weight(row, col)
+            self._rates[PITCH_TO_PA_OUTCOME[old]] -= weight
+            self._rates[PITCH_TO_PA_OUTCOME[outcome]] += weight
+        else:
+            self._dirty = True
+        for count, cells in self.cell_masses.items():
+            mass = cells.get((row, col))
+            if mass:
+                masses = self.outcome_masses[count]
+                masses[old] -= mass
+                masses[outcome] += mass
+
+    def rates(self):
+        """PA outcome probabilities for the current table."""
+        if self._dirty:
+            self._solve()
+        return dict(self._rates)
+
+    def pitches_per_pa(self):
+        if self._dirty:
+            self._solve()
+        return sum(self.visits.values())
+
+
+def print_rates(evaluator: IncrementalEvaluator):
+    rates = evaluator.rates()
+    for outcome, rate in rates.items():
+        print(f'Outcome - {outcome} - {100 * rate:.2f}%')
+    print(f"Batting Avg.: {batting_average(rates):.3f}  OBP: {on_base_percentage(rates):.3f}  Pitches/PA: {evaluator.pitches_per_pa():.2f}")
+
+
+if __name__ == "__main__":
+    from baseball2 import rings_pool, middle_swings_pool
+    from PitchOutcomes import parse_outcomes_csv
+    from Zone import parse_zone_csv
+
+    zone = Zone(parse_zone_csv("FakeBaseball 2/zone.csv"))
+    outcome_table = OutcomeTable(parse_outcomes_csv("FakeBaseball 2/outcomes.csv"))
+    strategy = CountStrategy.constant(rings_pool, middle_swings_pool)
+    evaluator = IncrementalEvaluator(zone, outcome_table, strategy, strategy)
+    print_rates(evaluator)
+    while True:
+        edit = input("Edit cell (row col OUTCOME, blank to quit)?: ").split()
+        if not edit:
+            break
+        evaluator.set_cell(int(edit[0]), int(edit[1]), PitchOutcome[edit[2].upper()])
+        print_rates(evaluator)
@@ -0,0 +1,154 @@
+import json
+import time
+from collections import defaultdict
+import engine
+from game_state import GameState
+from PitchOutcomes import OutcomeTable
+from Zone import Zone
+
+# Report order, outermost phase first. Times are inclusive of the phases nested inside them.
+PHASES = ["sim_game", "sim_plate_appearance", "sim_pitch", "pitch_algo", "swing_algo",
+          "get_outcome", "index_to_position", "state_transition"]
+
+
+class Profiler():
+    '''
+    Opt-in instrumentation for the simulation loop.
+    While installed (use it as a context manager) it is engine.profiler, so engine.sim_game and
+    engine.sim_plate_appearance hand their work to it, and it times those, the sim_pitch function and
+    the strategy callbacks passed to them. OutcomeTable.get_outcome, Zone.index_to_position and the
+    GameState transitions are wrapped on their classes. When no profiler is installed the drivers
+    only pay for one None check.
+    '''
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.times = defaultdict(float)
+        self.callback_calls = defaultdict(int)
+        self.callback_times = defaultdict(float)
+        self.pitches_per_pa = defaultdict(int)
+        self._originals = []
+        self._wrapped_callbacks = {}
+        self._installed = False
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def _timed(self, phase, func, calls=None, times=None, key=None):
+        calls = self.calls if calls is None else calls
+        times = self.times if times is None else times
+        key = phase if key is None else key
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                times[key] += clock() - start
+                calls[key] += 1
+        return wrapper
+
+    def _timed_callback(self, phase, func, per_name=True):
+        """Time a function passed into the loop, optionally also under its own name."""
+        key = (phase, func)
+        if key not in self._wrapped_callbacks:
+            inner = func
+            if per_name:
+                name = f"{phase}:{getattr(func, '__name__', type(func).__name__)}"
+                inner = self._timed(phase, func, self.callback_calls, self.callback_times, name)
+            self._wrapped_callbacks[key] = self._timed(phase, inner)
+        return self._wrapped_callbacks[key]
+
+    def _record(self, phase, start):
+        self.times[phase] += time.perf_counter() - start
+        self.calls[phase] += 1
+
+    def plate_appearance(self, play, sim_pitch_func, state, pitch_algo, swing_algo, verbose):
+        """Called by engine.sim_plate_appearance with the function that plays the plate appearance."""
+        pitches_before = self.calls["sim_pitch"]
+        start = time.perf_counter()
+        try:
+            outcome = play(self._timed_callback("sim_pitch", sim_pitch_func, per_name=False), state,
+                           self._timed_callback("pitch_algo", pitch_algo),
+                           self._timed_callback("swing_algo", swing_algo), verbose)
+        finally:
+            self._record("sim_plate_appearance", start)
+        self.pitches_per_pa[self.calls["sim_pitch"] - pitches_before] += 1
+        return outcome
+
+    def game(self, play, *args):
+        """Called by engine.sim_game with the function that plays the game."""
+        start = time.perf_counter()
+        try:
+            return play(*args)
+        finally:
+            self._record("sim_game", start)
+
+    def _patch(self, owner, name, replacement):
+        self._originals.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def install(self):
+        if self._installed:
+            return
+        if engine.profiler is not None:
+            raise RuntimeError("Another Profiler is already installed")
+        engine.profiler = self
+        self._installed = True
+        self._patch(OutcomeTable, "get_outcome", self._timed("get_outcome", OutcomeTable.get_outcome))
+        self._patch(Zone, "index_to_position", self._timed("index_to_position", Zone.index_to_position))
+        for name in engine.STATE_TRANSITIONS.values():
+            self._patch(GameState, name, self._timed("state_transition", getattr(GameState, name)))
+
+    def uninstall(self):
+        if not self._installed:
+            return
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        engine.profiler = None
+        self._installed = False
+
+    def to_dict(self):
+        pa_count = sum(self.pitches_per_pa.values())
+        pitch_count = sum(pitches * count for pitches, count in self.pitches_per_pa.items())
+        return {
+            "phases": {phase: {"calls": self.calls[phase], "seconds": self.times[phase]}
+                       for phase in PHASES if self.calls[phase]},
+            "callbacks": {name: {"calls": self.callback_calls[name], "seconds": self.callback_times[name]}
+                          for name in self.callback_calls},
+            "pitches_per_pa": {
+                "mean": pitch_count / pa_count if pa_count else 0.0,
+                "histogram": {str(pitches): count for pitches, count in sorted(self.pitches_per_pa.items())}
+            }
+        }
+
+    def to_json(self, json_path=None):
+        """Return the counters as a JSON string, also writing them to json_path if given."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if json_path:
+            with open(json_path, 'w') as file:
+                file.write(text)
+        return text
+
+    def report(self):
+        data = self.to_dict()
+        lines = [f"{'Phase':<22} {'Calls':>10} {'Total s':>10} {'Per call us':>12}"]
+        for phase, row in data["phases"].items():
+            lines.append(f"{phase:<22} {row['calls']:>10} {row['seconds']:>10.3f} {1e6 * row['seconds'] / row['calls']:>12.2f}")
+
+        lines.append("")
+        lines.append(f"{'Strategy callback':<34} {'Calls':>10} {'Per call us':>12}")
+        # Slowest strategies first, so an expensive user callback stands out
+        callbacks = sorted(data["callbacks"].items(), key=lambda item: item[1]["seconds"] / item[1]["calls"], reverse=True)
+        for name, row in callbacks:
+            lines.append(f"{name:<34} {row['calls']:>10} {1e6 * row['seconds'] / row['calls']:>12.2f}")
+
+        lines.append("")
+        lines.append(f"Pitches per PA: {data['pitches_per_pa']['mean']:.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,93 @@
+import random
+
+
+def span(start, stop):
+    """Indices start..stop-1 of the linear 1000 slot zone (same as range)."""
+    return list(range(start, stop))
+
+
+def rect(x0, x1, y0, y1, width=32):
+    """Indices of the grid cells with x0 <= x <= x1 and y0 <= y <= y1 (1-based, row by row)."""
+    return [(y - 1) * width + x for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+
+def ring(x0, x1, y0, y1, width=32):
+    '''
+    Indices of the border of a rectangle on the grid: the top row, the bottom row,
+    then the left and right columns without the corners.
+    '''
+    return rect(x0, x1, y0, y0, width) + rect(x0, x1, y1, y1, width) + \
+           rect(x0, x0, y0 + 1, y1 - 1, width) + rect(x1, x1, y0 + 1, y1 - 1, width)
+
+
+class Sampler():
+    '''
+    A discrete distribution over zone indices, built once and drawn from in O(1).
+    Uniform distributions draw with random.choice; weighted ones use Vose's alias tables.
+    A Sampler can be passed anywhere a pitch or swing algorithm is expected.
+    '''
+
+    def __init__(self, values, weights=None):
+        self.values = list(values)
+        if not self.values:
+            raise ValueError("Sampler needs at least one value")
+        if weights is None:
+            weights = [1] * len(self.values)
+        self.weights = list(weights)
+        if len(self.weights) != len(self.values) or any(weight < 0 for weight in self.weights) or sum(self.weights) <= 0:
+            raise ValueError("Sampler weights must be non-negative, match the values and not all be zero")
+        self.uniform = len(set(self.weights)) == 1
+        if not self.uniform:
+            self._build_alias_tables()
+
+    @classmethod
+    def from_regions(cls, regions):
+        '''
+        Build a sampler from (indices, weight) pairs, where weight applies to every index in the region.
+        Overlapping regions add up. Indices keep the order they first appear in.
+        '''
+        weights = {}
+        for indices, weight in regions:
+            for index in indices:
+                weights[index] = weights.get(index, 0) + weight
+        return cls(weights.keys(), weights.values())
+
+    def _build_alias_tables(self):
+        n = len(self.values)
+        total = sum(self.weights)
+        scaled = [weight * n / total for weight in self.weights]
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Anything left over is 1.0 up to rounding error and keeps prob 1
+
+    def draw(self):
+        if self.uniform:
+            return random.choice(self.values)
+        i = int(random.random() * len(self.values))
+        return self.values[i] if random.random() < self._prob[i] else self.values[self._alias[i]]
+
+    def draw_many(self, num):
+        if self.uniform:
+            return random.choices(self.values, k=num)
+        values, prob, alias, n, rand = self.values, self._prob, self._alias, len(self.values), random.random
+        draws = []
+        for _ in range(num):
+            i = int(rand() * n)
+            draws.append(values[i] if rand() < prob[i] else values[alias[i]])
+        return draws
+
+    def distribution(self):
+        """Return [(index, probability)] for every index in the sampler."""
+        total = sum(self.weights)
+        return [(value, weight / total) for value, weight in zip(self.values, self.weights)]
+
+    def __call__(self, state=None):
+        return self.draw()
@@ -0,0 +1,153 @@
+import random
+from baseball2 import save_as_csv
+from engine import STATE_TRANSITIONS, pa_stats
+from game_state import GameState, PAOutcome
+from pa_model import IncrementalEvaluator, batting_average, on_base_percentage
+from PitchOutcomes import PitchOutcome
+
+INNINGS_PER_GAME = 9
+
+# GameState transition for each PA outcome, starting from a fresh count
+PA_TRANSITIONS = {PAOutcome.STRIKEOUT: "strike", PAOutcome.WALK: "ball"}
+PA_TRANSITIONS.update({pa_outcome: STATE_TRANSITIONS[PitchOutcome[pa_outcome.name]]
+                       for pa_outcome in PAOutcome if pa_outcome not in PA_TRANSITIONS})
+
+OUT_OUTCOMES = [PAOutcome.STRIKEOUT, PAOutcome.GB, PAOutcome.SF, PAOutcome.DP, PAOutcome.PO, PAOutcome.FC]
+
+BASE_OUT_STATES = [((first, second, third), outs) for outs in range(3)
+                   for first in (False, True) for second in (False, True) for third in (False, True)]
+
+
+def _base_out_transitions():
+    '''
+    For every base/out state and PA outcome, play the outcome on a GameState and record
+    (runs scored, next base/out state), with None as the next state once the half inning is over.
+    '''
+    transitions = {}
+    for bases, outs in BASE_OUT_STATES:
+        for outcome, method in PA_TRANSITIONS.items():
+            state = GameState()
+            state.bases = list(bases)
+            state.outs = outs
+            if outcome == PAOutcome.STRIKEOUT:
+                state.strikes = 2
+            elif outcome == PAOutcome.WALK:
+                state.balls = 3
+            getattr(state, method)()
+            next_state = (tuple(state.bases), state.outs) if state.top else None
+            transitions[((bases, outs), outcome)] = (state.score[0], next_state)
+    return transitions
+
+
+_transitions = _base_out_transitions()
+
+
+def runs_per_game(rates, tolerance=1e-12, max_iterations=10000):
+    '''
+    Expected runs a team scores in nine innings when every PA follows the given outcome rates,
+    from the base/out Markov chain (extra innings and walk-offs are ignored).
+    '''
+    if sum(rates[outcome] for outcome in OUT_OUTCOMES) <= 0:
+        raise ValueError("Innings never end without outs")
+    expected = {state: 0.0 for state in BASE_OUT_STATES}
+    for _ in range(max_iterations):
+        updated = {}
+        for state in BASE_OUT_STATES:
+            total = 0.0
+            for outcome, rate in rates.items():
+                if rate:
+                    runs, next_state = _transitions[(state, outcome)]
+                    total += rate * (runs + (expected[next_state] if next_state else 0.0))
+            updated[state] = total
+        change = max(abs(updated[state] - expected[state]) for state in BASE_OUT_STATES)
+        expected = updated
+        if change < tolerance:
+            break
+    return INNINGS_PER_GAME * expected[((False, False, False), 0)]
+
+
+METRICS = {"avg": batting_average, "obp": on_base_percentage, "runs_per_game": runs_per_game}
+
+
+def metric_values(rates):
+    return {name: metric(rates) for name, metric in METRICS.items()}
+
+
+def cell_sensitivity(evaluator: IncrementalEvaluator, replacement=PitchOutcome.SINGLE):
+    '''
+    For every outcome table cell, how much AVG, OBP and runs per game change if that cell alone is
+    switched to the replacement outcome. Returns {metric: grid} with grids shaped like the outcome table,
+    plus "weight": the expected swings per PA landing on each cell.
+    '''
+    base = metric_values(evaluator.rates())
+    rows, cols = len(evaluator.table), len(evaluator.table[0])
+    grids = {name: [[0.0] * cols for _ in range(rows)] for name in list(METRICS) + ["weight"]}
+    for row in range(rows):
+        for col in range(cols):
+            grids["weight"][row][col] = evaluator.cell_weight(row, col)
+            original = PitchOutcome(evaluator.table[row][col])
+            if original == replacement or grids["weight"][row][col] == 0.0:
+                continue
+            evaluator.set_cell(row, col, replacement)
+            for name, value in metric_values(evaluator.rates()).items():
+                grids[name][row][col] = value - base[name]
+            evaluator.set_cell(row, col, original)
+    return grids
+
+
+def save_heatmaps(grids, prefix):
+    """Write each grid to <prefix>_<metric>.csv, one row per outcome table row."""
+    paths = []
+    for name, grid in grids.items():
+        path = f"{prefix}_{name}.csv"
+        save_as_csv([[f"{value:.6g}" for value in row] for row in grid], path)
+        paths.append(path)
+    return paths
+
+
+def _v1_metrics(pitch_func, swing_func, sims, seed):
+    from baseball import Baseball1PitchAdapter
+    random.seed(seed)
+    counts = pa_stats(Baseball1PitchAdapter().sim_pitch, pitch_func, swing_func, sims, verbose=False)
+    return metric_values({outcome: num / sims for outcome, num in counts.items()})
+
+
+def delta_sensitivity(pitch_func, swing_func, sims=20000, seed=0, step=1):
+    '''
+    Central finite difference of AVG, OBP and runs per game with respect to each baseball.py delta_table
+    threshold. Every run reuses the same seed (common random numbers) so the differences aren't swamped by noise.
+    The largest threshold (doubleplay) is left out: it has to cover every possible contact delta, so
+    moving it changes nothing and its derivative can't be measured.
+    Returns {threshold name: {metric: derivative per unit of delta}}.
+    '''
+    # The v1 engine is only needed here, so importing this module for the heatmaps doesn't load it
+    import baseball
+    derivatives = {}
+    for name, _ in baseball.delta_outcomes[:-1]:
+        original = baseball.delta_table[name]
+        try:
+            baseball.delta_table[name] = original + step
+            up = _v1_metrics(pitch_func, swing_func, sims, seed)
+            baseball.delta_table[name] = original - step
+            down = _v1_metrics(pitch_func, swing_func, sims, seed)
+        finally:
+            baseball.delta_table[name] = original
+        derivatives[name] = {metric: (up[metric] - down[metric]) / (2 * step) for metric in METRICS}
+    return derivatives
+
+
+if __name__ == "__main__":
+    import baseball
+    from baseball2 import rings_pool, middle_swings_pool
+    from count_strategy import CountStrategy
+    from PitchOutcomes import OutcomeTable, parse_outcomes_csv
+    from Zone import Zone, parse_zone_csv
+
+    zone = Zone(parse_zone_csv("FakeBaseball 2/zone.csv"))
+    outcome_table = OutcomeTable(parse_outcomes_csv("FakeBaseball 2/outcomes.csv"))
+    strategy = CountStrategy.constant(rings_pool, middle_swings_pool)
+    evaluator = IncrementalEvaluator(zone, outcome_table, strategy, strategy)
+    print(save_heatmaps(cell_sensitivity(evaluator), "FakeBaseball 2/rings_vs_middle_swings_sensitivity"))
+
+    for name, row in delta_sensitivity(baseball.random_pitch, baseball.realistic_take_swing).items():
+        print(f"{name:<16} " + "  ".join(f"{metric}: {value:+.5f}" for metric, value in row.items()))
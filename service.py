@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import count
+from jobs import job_chunks, normalize_job, run_chunk
+
+
+STATUS_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class Job():
+
+    def __init__(self, job_id, spec, key):
+        self.id = job_id
+        self.spec = spec
+        self.key = key
+        self.status = "queued"
+        self.done = 0
+        self.total = spec["sims"] if spec["kind"] == "pa_stats" else spec["games"]
+        self.result = None
+        self.error = None
+        self.version = 0
+        self.changed = asyncio.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    async def notify(self):
+        async with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+    async def wait_for_change(self, seen_version):
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.version != seen_version)
+
+    def to_dict(self):
+        return {"id": self.id, "status": self.status, "done": self.done, "total": self.total,
+                "job": self.spec, "result": self.result, "error": self.error}
+
+
+class SimulationService():
+    '''
+    Local HTTP/JSON front end for simulation jobs.
+    POST /jobs queues a job, GET /jobs/<id> returns its state and GET /jobs/<id>/events streams
+    one JSON line per progress update. Jobs run in a process pool whose workers keep parsed tables
+    cached between chunks. Identical requests share one job, and the max_finished most recently
+    used finished jobs stay around as a result cache.
+    '''
+
+    def __init__(self, workers=None, max_finished=1000):
+        self.workers = workers
+        self.pool = self._new_pool()
+        self.max_finished = max_finished
+        self.jobs = {}
+        self.jobs_by_key = {}
+        # Finished job ids, least recently used first
+        self._finished = OrderedDict()
+        self._ids = count(1)
+
+    def _new_pool(self):
+        # Forked workers would inherit open client sockets and keep those connections from closing
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def submit(self, spec):
+        """Queue a job (or return the existing one for an identical request). Must be called from the event loop."""
+        # Normalizing reads and fingerprints files, keep that off the event loop
+        job_spec = await asyncio.get_running_loop().run_in_executor(None, normalize_job, spec)
+        key = json.dumps(job_spec, sort_keys=True)
+        if key in self.jobs_by_key:
+            job = self.jobs_by_key[key]
+            if job.id in self._finished:
+                self._finished.move_to_end(job.id)
+            return job
+
+        job = Job(str(next(self._ids)), job_spec, key)
+        self.jobs[job.id] = job
+        self.jobs_by_key[key] = job
+        asyncio.get_running_loop().create_task(self._run(job))
+        return job
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        job.status = "running"
+        await job.notify()
+        result = {}
+        try:
+            futures = [loop.run_in_executor(pool, run_chunk, job.spec, index, num) for index, num in job_chunks(job.spec)]
+            for future in asyncio.as_completed(futures):
+                num, counts = await future
+                for name, value in counts.items():
+                    result[name] = result.get(name, 0) + value
+                job.done += num
+                await job.notify()
+            job.result = result
+            job.status = "done"
+        except Exception as error:
+            job.error = str(error)
+            job.status = "failed"
+            # Don't cache failures, a retry should run again
+            del self.jobs_by_key[job.key]
+            if isinstance(error, BrokenProcessPool):
+                self._replace_pool(pool)
+        self._finish(job)
+        await job.notify()
+
+    def _finish(self, job):
+        self._finished[job.id] = job
+        while len(self._finished) > self.max_finished:
+            _, evicted = self._finished.popitem(last=False)
+            del self.jobs[evicted.id]
+            if self.jobs_by_key.get(evicted.key) is evicted:
+                del self.jobs_by_key[evicted.key]
+
+    def _replace_pool(self, broken):
+        """A worker died (e.g. killed for memory), which breaks the pool for good. Later jobs get a new one."""
+        if self.pool is broken:
+            self.pool = self._new_pool()
+            broken.shutdown(wait=False)
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode()
+            if not request_line:
+                return
+            method, path, _ = request_line.split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            await self._route(method, path, body, writer)
+        except (ValueError, KeyError) as error:
+            await self._send_json(writer, 400, {"error": str(error)})
+        except asyncio.IncompleteReadError:
+            await self._send_json(writer, 400, {"error": "Request body is shorter than its Content-Length"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body, writer):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            await self._send_json(writer, 200, {"status": "ok", "jobs": len(self.jobs)})
+        elif parts == ["jobs"]:
+            if method != "POST":
+                await self._send_json(writer, 405, {"error": "Use POST to submit a job"})
+                return
+            job = await self.submit(json.loads(body or b"{}"))
+            await self._send_json(writer, 200 if job.finished else 202, job.to_dict())
+        elif len(parts) in (2, 3) and parts[0] == "jobs" and parts[1] in self.jobs:
+            job = self.jobs[parts[1]]
+            if len(parts) == 2:
+                await self._send_json(writer, 200, job.to_dict())
+            elif parts[2] == "events":
+                await self._stream_events(job, writer)
+            else:
+                await self._send_json(writer, 404, {"error": f"Not found: {path}"})
+        else:
+            await self._send_json(writer, 404, {"error": f"Not found: {path}"})
+
+    async def _stream_events(self, job, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        while True:
+            seen_version = job.version
+            writer.write(json.dumps(job.to_dict()).encode() + b"\n")
+            await writer.drain()
+            if job.finished:
+                return
+            await job.wait_for_change(seen_version)
+
+    async def _send_json(self, writer, status, data):
+        body = json.dumps(data).encode()
+        writer.write(f"HTTP/1.1 {status} {STATUS_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving simulations on http://{host}:{server.sockets[0].getsockname()[1]}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local simulation job service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(SimulationService(args.workers).serve(args.host, args.port))
@@ -0,0 +1,75 @@
+from array import array
+from game_state import PAOutcome
+
+STAT_NAMES = ["PA", "H", "BB", "K", "HR", "RBI", "P"]
+
+HITS = (PAOutcome.HR, PAOutcome.TRIPLE, PAOutcome.DOUBLE, PAOutcome.SINGLE)
+
+
+class StatBook():
+    '''
+    Batting stat lines for a fixed set of players, one array per stat indexed by player id
+    (the player's position in names). Lineups hold these ids.
+    Use a fresh StatBook per game as a box score and add() it into a season StatBook,
+    or pass the season StatBook straight to sim_games; either way memory doesn't grow with games played.
+    '''
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.stats = {stat: array('l', [0] * len(self.names)) for stat in STAT_NAMES}
+
+    def record_pa(self, player, outcome: PAOutcome, runs, pitches):
+        stats = self.stats
+        stats["PA"][player] += 1
+        stats["P"][player] += pitches
+        stats["RBI"][player] += runs
+        if outcome in HITS:
+            stats["H"][player] += 1
+            if outcome == PAOutcome.HR:
+                stats["HR"][player] += 1
+        elif outcome == PAOutcome.WALK:
+            stats["BB"][player] += 1
+        elif outcome == PAOutcome.STRIKEOUT:
+            stats["K"][player] += 1
+
+    def add(self, other):
+        if other.names != self.names:
+            raise ValueError("Can only add stat books for the same players")
+        for stat in STAT_NAMES:
+            column = self.stats[stat]
+            for player, value in enumerate(other.stats[stat]):
+                column[player] += value
+
+    def reset(self):
+        for stat in STAT_NAMES:
+            column = self.stats[stat]
+            for player in range(len(column)):
+                column[player] = 0
+
+    def columns(self):
+        """The stat columns as plain lists, e.g. for checkpoints."""
+        return {stat: list(self.stats[stat]) for stat in STAT_NAMES}
+
+    def set_columns(self, columns):
+        for stat in STAT_NAMES:
+            if len(columns[stat]) != len(self.names):
+                raise ValueError(f"Expected {len(self.names)} {stat} values, got {len(columns[stat])}")
+            self.stats[stat] = array('l', columns[stat])
+
+    def line(self, player):
+        line = {stat: self.stats[stat][player] for stat in STAT_NAMES}
+        at_bats = line["PA"] - line["BB"]
+        line["AVG"] = line["H"] / at_bats if at_bats else 0.0
+        line["OBP"] = (line["H"] + line["BB"]) / line["PA"] if line["PA"] else 0.0
+        return line
+
+    def format(self, players=None):
+        """Box score / season table for the given player ids (everyone with a PA by default)."""
+        if players is None:
+            players = [player for player in range(len(self.names)) if self.stats["PA"][player]]
+        rows = [f"{'Player':<20} " + " ".join(f"{stat:>6}" for stat in STAT_NAMES) + f" {'AVG':>6} {'OBP':>6}"]
+        for player in players:
+            line = self.line(player)
+            rows.append(f"{self.names[player]:<20} " + " ".join(f"{line[stat]:>6}" for stat in STAT_NAMES) +
+                        f" {line['AVG']:>6.3f} {line['OBP']:>6.3f}")
+        return "\n".join(rows)
@@ -0,0 +1,107 @@
+import os
+import struct
+import zlib
+from PitchOutcomes import OutcomeTable
+from Zone import Zone
+
+DEFAULT_ZONE = "FakeBaseball 2/zone.csv"
+DEFAULT_OUTCOMES = "FakeBaseball 2/outcomes.csv"
+DEFAULT_BUNDLE = "FakeBaseball 2/default_tables.bin"
+
+MAGIC = b"FBTAB2\n"
+# crc32 of each source file (zone, outcomes) with its line endings normalized, then the payload crc32
+HEADER = struct.Struct("<III")
+# Zone rows/cols and outcome table rows/cols, followed by one byte per cell of each table
+DIMENSIONS = struct.Struct("<HHHH")
+
+
+def _source_crc(path):
+    """crc32 of a text file with CRLF line endings read as LF, so a CRLF checkout matches the bundle."""
+    with open(path, 'rb') as file:
+        return zlib.crc32(file.read().replace(b"\r\n", b"\n"))
+
+
+def file_fingerprint(path):
+    """Size and crc32 of the file's contents, for cache keys that should change when the file is edited."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    return f"{len(data)}:{zlib.crc32(data):08x}"
+
+
+def build_bundle(zone_path=DEFAULT_ZONE, outcomes_path=DEFAULT_OUTCOMES, bundle_path=DEFAULT_BUNDLE):
+    """Parse the CSV pair and write it to bundle_path as one checksummed binary file."""
+    from PitchOutcomes import parse_outcomes_csv
+    from Zone import parse_zone_csv
+
+    tables = [parse_zone_csv(zone_path), parse_outcomes_csv(outcomes_path)]
+    payload = bytearray(DIMENSIONS.pack(len(tables[0]), len(tables[0][0]), len(tables[1]), len(tables[1][0])))
+    for table in tables:
+        if any(len(row) != len(table[0]) for row in table):
+            raise ValueError("Tables must be rectangular to be bundled")
+        for row in table:
+            payload += bytes(row)  # ValueError unless every cell fits in a byte
+    header = HEADER.pack(_source_crc(zone_path), _source_crc(outcomes_path), zlib.crc32(payload))
+
+    temp_path = bundle_path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(MAGIC + header + payload)
+    os.replace(temp_path, bundle_path)
+    return bundle_path
+
+
+def _fresh(path, crc):
+    '''
+    Whether the source file still matches what the bundle was built from. Its contents are always compared:
+    mtimes change on every checkout, and sizes with the line endings git checks the CSVs out with.
+    '''
+    try:
+        return _source_crc(path) == crc
+    except OSError:
+        return False
+
+
+def load_bundle(bundle_path=DEFAULT_BUNDLE, zone_path=DEFAULT_ZONE, outcomes_path=DEFAULT_OUTCOMES):
+    """(zone_table, outcome_table) from the bundle, or None if it is missing, corrupt or older than its sources."""
+    try:
+        with open(bundle_path, 'rb') as file:
+            data = file.read()
+    except OSError:
+        return None
+    start = len(MAGIC) + HEADER.size
+    if data[:len(MAGIC)] != MAGIC or len(data) < start + DIMENSIONS.size:
+        return None
+    zone_crc, outcomes_crc, crc = HEADER.unpack_from(data, len(MAGIC))
+    payload = memoryview(data)[start:]
+    if zlib.crc32(payload) != crc:
+        return None
+    if not (_fresh(zone_path, zone_crc) and _fresh(outcomes_path, outcomes_crc)):
+        return None
+
+    zone_rows, zone_cols, outcome_rows, outcome_cols = DIMENSIONS.unpack_from(payload)
+    if DIMENSIONS.size + zone_rows * zone_cols + outcome_rows * outcome_cols != len(payload):
+        return None
+    tables = []
+    offset = DIMENSIONS.size
+    for rows, cols in ((zone_rows, zone_cols), (outcome_rows, outcome_cols)):
+        tables.append([list(payload[offset + row * cols:offset + (row + 1) * cols]) for row in range(rows)])
+        offset += rows * cols
+    return tables[0], tables[1]
+
+
+def load_tables(zone_path=DEFAULT_ZONE, outcomes_path=DEFAULT_OUTCOMES, bundle_path=None):
+    '''
+    Zone and OutcomeTable for the CSV pair, read from the precompiled bundle when it is up to date
+    (the CSVs are still read to check that, but not parsed) and parsed from the CSVs otherwise. The default pair uses DEFAULT_BUNDLE unless bundle_path is given.
+    '''
+    if bundle_path is None and (zone_path, outcomes_path) == (DEFAULT_ZONE, DEFAULT_OUTCOMES):
+        bundle_path = DEFAULT_BUNDLE
+    tables = load_bundle(bundle_path, zone_path, outcomes_path) if bundle_path else None
+    if tables is None:
+        from PitchOutcomes import parse_outcomes_csv
+        from Zone import parse_zone_csv
+        tables = parse_zone_csv(zone_path), parse_outcomes_csv(outcomes_path)
+    return Zone(tables[0]), OutcomeTable(tables[1])
+
+
+if __name__ == "__main__":
+    print(f"Wrote {build_bundle()}")
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from engine import PitchEngine, tables_fingerprint
+from game_state import GameState
+from PitchOutcomes import PitchOutcome, OutcomeTable, parse_outcomes_csv
+from Zone import Zone, parse_zone_csv
+
+
+class Player():
+    """A batter or pitcher, optionally with their own zone and/or outcome table."""
+
+    def __init__(self, name, zone: Zone = None, outcome_table: OutcomeTable = None):
+        self.name = name
+        self.zone = zone
+        self.outcome_table = outcome_table
+
+    def __repr__(self):
+        return f"Player({self.name!r})"
+
+
+class CompiledMatchup():
+    '''
+    A zone and outcome table flattened into plain lists for fast lookups:
+    positions and outside flags per zone index, and the outcome table cells as PitchOutcome members.
+    Resolves pitches exactly like OutcomeTable.get_outcome.
+    '''
+
+    def __init__(self, zone: Zone, outcome_table: OutcomeTable):
+        # Holding on to the tables keeps their ids (the TableStore cache key) from being reused
+        self.zone = zone
+        self.outcome_table = outcome_table
+        self.size = zone.size
+        self.positions = [None] + [zone.index_to_position(index) for index in range(1, zone.size + 1)]
+        self.outside = [None] + [zone.is_outside(index) for index in range(1, zone.size + 1)]
+        self.cells = [[PitchOutcome(value) for value in row] for row in outcome_table.outcome_table]
+        self.center_x, self.center_y = outcome_table.outcome_table_center
+        self.rows = len(self.cells)
+        self.cols = len(self.cells[0])
+
+    def resolve(self, pitch, swing) -> PitchOutcome:
+        assert 0 < pitch <= self.size and (swing == -1 or 0 < swing <= self.size)
+        if swing == -1:
+            return PitchOutcome.BALL if self.outside[pitch] else PitchOutcome.STRIKE
+        pitch_x, pitch_y = self.positions[pitch]
+        swing_x, swing_y = self.positions[swing]
+        col = pitch_x - swing_x + self.center_x
+        row = pitch_y - swing_y + self.center_y
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.cells[row][col]
+        return PitchOutcome.STRIKE
+
+
+class TableStore():
+    '''
+    Interns zones and outcome tables by content, so players that share a table share one object,
+    and keeps an LRU cache of CompiledMatchups for (pitcher, batter) pairings.
+    A pairing uses the batter's zone and outcome table when they have one, then the pitcher's, then the defaults.
+    Pairings that resolve to the same tables share one cache entry.
+    '''
+
+    def __init__(self, default_zone: Zone, default_outcome_table: OutcomeTable, max_compiled=64):
+        self._zones = {}
+        self._outcome_tables = {}
+        self._compiled = OrderedDict()
+        self.max_compiled = max_compiled
+        self.default_zone = self.intern_zone(default_zone)
+        self.default_outcome_table = self.intern_outcome_table(default_outcome_table)
+
+    @staticmethod
+    def _key(table):
+        return tuple(tuple(row) for row in table)
+
+    def intern_zone(self, zone: Zone) -> Zone:
+        return self._zones.setdefault(self._key(zone.zone_table), zone)
+
+    def intern_outcome_table(self, outcome_table: OutcomeTable) -> OutcomeTable:
+        return self._outcome_tables.setdefault(self._key(outcome_table.outcome_table), outcome_table)
+
+    def load_zone(self, csv_path) -> Zone:
+        return self.intern_zone(Zone(parse_zone_csv(csv_path)))
+
+    def load_outcome_table(self, csv_path) -> OutcomeTable:
+        return self.intern_outcome_table(OutcomeTable(parse_outcomes_csv(csv_path)))
+
+    def player(self, name, zone: Zone = None, outcome_table: OutcomeTable = None) -> Player:
+        """Make a player whose tables are interned in this store."""
+        return Player(name, zone and self.intern_zone(zone), outcome_table and self.intern_outcome_table(outcome_table))
+
+    def matchup(self, pitcher: Player, batter: Player) -> CompiledMatchup:
+        zone = batter.zone or pitcher.zone or self.default_zone
+        outcome_table = batter.outcome_table or pitcher.outcome_table or self.default_outcome_table
+        # Tables made through this store are interned already, so identity is enough here
+        key = (id(zone), id(outcome_table))
+        if key in self._compiled:
+            self._compiled.move_to_end(key)
+            return self._compiled[key]
+        compiled = CompiledMatchup(zone, outcome_table)
+        self._compiled[key] = compiled
+        if len(self._compiled) > self.max_compiled:
+            self._compiled.popitem(last=False)
+        return compiled
+
+
+class LineupPitchAdapter(PitchEngine):
+    '''
+    Resolves each pitch with the tables of the current (pitcher, batter) pairing.
+    players maps the player ids used in TeamStrategy lineups/pitchers (and so in GameState) to Players.
+    The matchup is only looked up again when the pitcher or batter changes.
+    '''
+
+    def __init__(self, store: TableStore, players):
+        self.store = store
+        self.players = players
+        self._pairing = None
+        self._matchup = None
+
+    def sim_pitch(self, state: GameState, pitch_algo, swing_algo) -> PitchOutcome:
+        # Games only track lineups when both teams have one
+        if state.lineups is None or state.pitchers is None or None in state.pitchers:
+            raise ValueError("LineupPitchAdapter needs a lineup and a pitcher for both teams")
+        pairing = (state.current_pitcher(), state.current_batter())
+        if pairing != self._pairing:
+            self._pairing = pairing
+            self._matchup = self.store.matchup(self.players[pairing[0]], self.players[pairing[1]])
+        return super().sim_pitch(state, pitch_algo, swing_algo)
+
+    def resolve(self, pitch, swing) -> PitchOutcome:
+        return self._matchup.resolve(pitch, swing)
+
+    def rules_key(self):
+        tables = [(self.store.default_zone.zone_table, self.store.default_outcome_table.outcome_table)]
+        players = self.players.values() if isinstance(self.players, dict) else self.players
+        for player in players:
+            tables.append((player.zone and player.zone.zone_table, player.outcome_table and player.outcome_table.outcome_table))
+        return f"lineup:{tables_fingerprint(*tables)}"
@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from baseball2 import Baseball2PitchAdapter, TeamStrategy, load_adapter, pa_stats, sim_games, rings, swing, middle_swings, \
+    middle_swings_pool
+from count_strategy import CountStrategy
+from PitchOutcomes import OutcomeTable, parse_outcomes_csv
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+from test_helpers import InterruptingPitch
+
+
+class TestCheckpointResume(unittest.TestCase):
+
+    def setUp(self):
+        self.adapter = load_adapter(DEFAULT_ZONE, DEFAULT_OUTCOMES)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.tmpdir.name, "job.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_pa_stats_resume_matches_uninterrupted(self):
+        random.seed(3)
+        expected = pa_stats(self.adapter.sim_pitch, InterruptingPitch(), middle_swings, sims=500, verbose=False)
+
+        random.seed(3)
+        with self.assertRaises(KeyboardInterrupt):
+            pa_stats(self.adapter.sim_pitch, InterruptingPitch(limit=700), middle_swings, sims=500, verbose=False,
+                     checkpoint_path=self.checkpoint_path, checkpoint_interval=0)
+        self.assertTrue(os.path.exists(self.checkpoint_path))
+
+        random.seed(99)
+        resumed = pa_stats(self.adapter.sim_pitch, InterruptingPitch(), middle_swings, sims=500, verbose=False,
+                           checkpoint_path=self.checkpoint_path, resume=True)
+        self.assertEqual(resumed, expected)
+
+    def test_sim_games_resume_matches_uninterrupted(self):
+        strategyB = TeamStrategy(rings, swing)
+        random.seed(5)
+        expected = sim_games(self.adapter.sim_pitch, 6, TeamStrategy(InterruptingPitch(), middle_swings), strategyB, verbose=False)
+
+        random.seed(5)
+        with self.assertRaises(KeyboardInterrupt):
+            sim_games(self.adapter.sim_pitch, 6, TeamStrategy(InterruptingPitch(limit=400), middle_swings), strategyB,
+                      verbose=False, checkpoint_path=self.checkpoint_path, checkpoint_interval=0)
+
+        resumed = sim_games(self.adapter.sim_pitch, 6, TeamStrategy(InterruptingPitch(), middle_swings), strategyB,
+                            verbose=False, checkpoint_path=self.checkpoint_path, resume=True)
+        self.assertEqual(resumed, expected)
+
+    def test_resume_rejects_other_job(self):
+        pa_stats(self.adapter.sim_pitch, rings, middle_swings, sims=10, verbose=False, checkpoint_path=self.checkpoint_path)
+        with self.assertRaises(ValueError):
+            pa_stats(self.adapter.sim_pitch, rings, swing, sims=10, verbose=False,
+                     checkpoint_path=self.checkpoint_path, resume=True)
+        with self.assertRaises(ValueError):
+            pa_stats(self.adapter.sim_pitch, rings, middle_swings, sims=10, verbose=False,
+                     checkpoint_path=self.checkpoint_path, resume=True, job_key="seed 2")
+
+    def test_resume_rejects_other_tables(self):
+        pa_stats(self.adapter.sim_pitch, rings, middle_swings, sims=10, verbose=False, checkpoint_path=self.checkpoint_path)
+        ext_foul = OutcomeTable(parse_outcomes_csv("FakeBaseball 2/outcomes - ext foul.csv"))
+        with self.assertRaises(ValueError):
+            pa_stats(Baseball2PitchAdapter(self.adapter.zone, ext_foul).sim_pitch, rings, middle_swings, sims=10,
+                     verbose=False, checkpoint_path=self.checkpoint_path, resume=True)
+
+    def test_resume_rejects_other_strategy_table(self):
+        table = CountStrategy.load("FakeBaseball 2/realistic_take_swing.json")
+        pa_stats(self.adapter.sim_pitch, rings, table.swing_algo, sims=10, verbose=False, checkpoint_path=self.checkpoint_path)
+        # Same method names, different table file
+        other_path = os.path.join(self.tmpdir.name, "other.json")
+        with open(other_path, 'w') as file:
+            json.dump(CountStrategy.constant(swing_sampler=middle_swings_pool).to_dict(), file)
+        other = CountStrategy.load(other_path)
+        with self.assertRaises(ValueError):
+            pa_stats(self.adapter.sim_pitch, rings, other.swing_algo, sims=10, verbose=False,
+                     checkpoint_path=self.checkpoint_path, resume=True)
+
+    def test_lambda_strategies_cant_checkpoint(self):
+        with self.assertRaises(ValueError):
+            pa_stats(self.adapter.sim_pitch, rings, lambda state: -1, sims=10, verbose=False,
+                     checkpoint_path=self.checkpoint_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
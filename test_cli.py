@@ -0,0 +1,71 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from cli import main
+from columnar import read_columns
+from jobs import normalize_job, run_job
+
+
+def run_cli(*argv):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        main(list(argv) + ["--quiet"])
+    return output.getvalue()
+
+
+class TestCli(unittest.TestCase):
+
+    def test_pa_stats_json_matches_job(self):
+        result = json.loads(run_cli("pa-stats", "--sims", "600", "--seed", "3", "--format", "json"))
+        job = normalize_job({"pitch": "rings", "swing": "middle_swings", "sims": 600, "seed": 3})
+        self.assertEqual(result["counts"], run_job(job))
+        self.assertEqual(sum(result["counts"].values()), 600)
+
+    def test_results_dont_depend_on_workers(self):
+        job = normalize_job({"kind": "games", "games": 250, "team_a": {"pitch": "rings", "swing": "swing"},
+                             "team_b": {"pitch": "FakeBaseball 2/realistic_take_swing.json",
+                                        "swing": "FakeBaseball 2/realistic_take_swing.json"}})
+        self.assertEqual(run_job(job, workers=2), run_job(job))
+
+    def test_strategy_table_files(self):
+        with self.assertRaises(ValueError):
+            normalize_job({"pitch": "missing.json", "swing": "swing"})
+        totals = json.loads(run_cli("games", "--games", "20", "--team-b", "FakeBaseball 2/realistic_take_swing.json",
+                                    "--format", "json"))["totals"]
+        self.assertEqual(totals["a_wins"] + totals["b_wins"] + totals["ties"], 20)
+
+    def test_columnar_output_appends(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "runs.col")
+            for _ in range(2):
+                run_cli("pa-stats", "--sims", "50", "--format", "columnar", "--output", path)
+            columns = read_columns(path, ["label", "sims"])
+            self.assertEqual(columns["label"], ["rings vs middle_swings"] * 2)
+            self.assertEqual(list(columns["sims"]), [50, 50])
+
+    def test_league_and_heatmap(self):
+        standings = json.loads(run_cli("league", "--entry", "a=rings,swing", "--entry", "b=smart_pitch,middle_swings",
+                                       "--games", "20", "--format", "json"))["standings"]
+        self.assertEqual(sorted(row["name"] for row in standings), ["a", "b"])
+        text = run_cli("league", "--entry", "a=rings,swing", "--entry", "b=smart_pitch,middle_swings", "--games", "20")
+        self.assertEqual(text.splitlines()[0].split(), ["Team", "W", "L", "T", "Pct", "RF", "RA"])
+        heatmap = json.loads(run_cli("heatmap", "--format", "json"))
+        self.assertEqual(set(heatmap["grids"]), {"avg", "obp", "runs_per_game", "weight"})
+
+    def test_bad_arguments_exit(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                run_cli("pa-stats", "--pitch", "not_a_strategy")
+            with self.assertRaises(SystemExit):
+                run_cli("games", "--format", "columnar")
+            with self.assertRaises(SystemExit):
+                run_cli("heatmap", "--workers", "2")
+            with self.assertRaises(SystemExit):
+                run_cli("bench", "--workers", "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import unittest
+from baseball2 import TeamStrategy, load_adapter, rings, swing, smart_pitch, middle_swings
+from columnar import ColumnarWriter, iter_batches, read_columns, read_schema
+from engine import GAME_COLUMNS, PA_STATS_COLUMNS, pa_stats, pa_stats_row, sim_games
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "results.fbc")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_batches_append_and_read_lazily(self):
+        schema = {"name": "s", "count": "i", "rate": "f"}
+        with ColumnarWriter(self.path, schema, batch_size=3) as writer:
+            for i in range(5):
+                writer.append({"name": f"run{i}", "count": i, "rate": i / 4})
+        with ColumnarWriter(self.path, schema, batch_size=3) as writer:
+            writer.append({"name": "run5", "count": 5, "rate": 1.25})
+
+        self.assertEqual(read_schema(self.path), schema)
+        self.assertEqual([len(batch["count"]) for batch in iter_batches(self.path, ["count"])], [3, 2, 1])
+        self.assertEqual(list(iter_batches(self.path, ["count"]))[0].keys(), {"count"})
+        columns = read_columns(self.path)
+        self.assertEqual(list(columns["count"]), list(range(6)))
+        self.assertEqual(columns["name"][-1], "run5")
+        self.assertEqual(columns["rate"][2], 0.5)
+
+    def test_schema_mismatch_rejected(self):
+        with ColumnarWriter(self.path, {"count": "i"}) as writer:
+            writer.append({"count": 1})
+        with self.assertRaises(ValueError):
+            ColumnarWriter(self.path, {"count": "f"})
+        with self.assertRaises(ValueError):
+            ColumnarWriter(os.path.join(self.tmpdir.name, "other.fbc"), {"count": "x"})
+
+    def test_partial_batch_is_dropped(self):
+        schema = {"count": "i"}
+        with ColumnarWriter(self.path, schema, batch_size=2) as writer:
+            for i in range(4):
+                writer.append({"count": i})
+        # Killed part way through writing the second batch
+        with open(self.path, 'r+b') as file:
+            file.truncate(os.path.getsize(self.path) - 5)
+        self.assertEqual(list(read_columns(self.path)["count"]), [0, 1])
+
+        with ColumnarWriter(self.path, schema) as writer:
+            writer.append({"count": 4})
+        self.assertEqual(list(read_columns(self.path)["count"]), [0, 1, 4])
+
+    def test_simulation_aggregates(self):
+        adapter = load_adapter(DEFAULT_ZONE, DEFAULT_OUTCOMES)
+        random.seed(2)
+        with ColumnarWriter(self.path, GAME_COLUMNS, batch_size=4) as writer:
+            totals = sim_games(adapter.sim_pitch, 10, TeamStrategy(rings, swing), TeamStrategy(smart_pitch, middle_swings),
+                               verbose=False, recorder=writer)
+        games = read_columns(self.path)
+        self.assertEqual(sum(games["a_score"]), totals["a_runs"])
+        self.assertEqual(sum(games["b_score"]), totals["b_runs"])
+        self.assertTrue(all(innings >= 9 for innings in games["innings"]))
+        with self.assertRaises(ValueError):
+            sim_games(adapter.sim_pitch, 10, TeamStrategy(rings, swing), TeamStrategy(smart_pitch, middle_swings),
+                      verbose=False, recorder=writer, checkpoint_path=os.path.join(self.tmpdir.name, "job.json"), resume=True)
+
+        runs_path = os.path.join(self.tmpdir.name, "runs.fbc")
+        with ColumnarWriter(runs_path, PA_STATS_COLUMNS) as writer:
+            writer.append(pa_stats_row("rings_vs_middle", pa_stats(adapter.sim_pitch, rings, middle_swings, 50, verbose=False)))
+        self.assertEqual(read_columns(runs_path)["sims"][0], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
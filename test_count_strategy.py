@@ -0,0 +1,58 @@
+import os
+import random
+import tempfile
+import unittest
+from baseball2 import realistic_take_swing, rings, swing_probabilities
+from count_strategy import COUNTS, CountStrategy
+from game_state import GameState
+
+
+class TestCountStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.strategy = CountStrategy.load("FakeBaseball 2/realistic_take_swing.json")
+
+    def test_json_table_matches_realistic_take_swing(self):
+        state = GameState()
+        for balls, strikes in COUNTS:
+            state.balls, state.strikes = balls, strikes
+            self.assertAlmostEqual(self.strategy.swing_probs[balls][strikes], swing_probabilities[balls][strikes] / 100)
+            random.seed(balls * 3 + strikes)
+            expected = [realistic_take_swing(state) for _ in range(20)] + [rings(state) for _ in range(20)]
+            random.seed(balls * 3 + strikes)
+            actual = [self.strategy.swing_algo(state) for _ in range(20)] + [self.strategy.pitch_algo(state) for _ in range(20)]
+            self.assertEqual(actual, expected)
+
+    def test_counts_share_samplers(self):
+        self.assertIs(self.strategy.swing_samplers[0][0], self.strategy.swing_samplers[3][2])
+
+    def test_csv_and_dict_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "strategy.csv")
+            with open(csv_path, 'w') as file:
+                file.write("balls,strikes,field,index,value\n")
+                file.write("*,*,swing_prob,,0.5\n")
+                file.write("3,*,swing_prob,,0\n")
+                file.write("*,*,pitch,500,1\n")
+                file.write("*,2,pitch,1,3\n")
+                file.write("*,*,swing,500,1\n")
+            strategy = CountStrategy.from_csv(csv_path)
+
+        self.assertEqual(strategy.swing_probs[3][1], 0.0)
+        self.assertEqual(strategy.swing_probs[0][0], 0.5)
+        self.assertEqual(strategy.pitch_distribution(0, 0), [(500, 1.0)])
+        self.assertEqual(strategy.pitch_distribution(1, 2), [(500, 0.25), (1, 0.75)])
+
+        copy = CountStrategy.from_dict(strategy.to_dict())
+        self.assertEqual(copy.to_dict(), strategy.to_dict())
+
+    def test_missing_side_raises(self):
+        strategy = CountStrategy.constant(swing_sampler=self.strategy.swing_samplers[0][0])
+        with self.assertRaises(ValueError):
+            strategy.pitch_algo(GameState())
+        with self.assertRaises(ValueError):
+            CountStrategy.from_dict({"counts": {"4-0": {}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+import baseball
+from baseball import Baseball1PitchAdapter, resolve_pitch, random_pitch, realistic_take_swing
+from baseball2 import load_adapter, rings, middle_swings
+from engine import apply_outcome, head_to_head, sim_plate_appearance
+from game_state import GameState
+from PitchOutcomes import PitchOutcome
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+
+
+class TestEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.v1 = Baseball1PitchAdapter()
+        self.v2 = load_adapter(DEFAULT_ZONE, DEFAULT_OUTCOMES)
+
+    def test_apply_outcome_rejects_unknown(self):
+        with self.assertRaises(ValueError):
+            apply_outcome(GameState(), "strike")
+
+    def test_resolve_pitch_v1(self):
+        self.assertEqual(resolve_pitch(500, -1), PitchOutcome.STRIKE)
+        self.assertEqual(resolve_pitch(1, -1), PitchOutcome.BALL)
+        self.assertEqual(resolve_pitch(500, 500), PitchOutcome.HR)
+        self.assertEqual(resolve_pitch(500, 450), PitchOutcome.SINGLE)
+        self.assertEqual(resolve_pitch(35, 500), PitchOutcome.FOUL)
+
+    def test_v1_engine_matches_legacy_loop(self):
+        random.seed(11)
+        legacy_state = GameState()
+        for _ in range(300):
+            baseball.sim_pa(legacy_state, random_pitch, realistic_take_swing)
+
+        random.seed(11)
+        state = GameState()
+        for _ in range(300):
+            sim_plate_appearance(self.v1.sim_pitch, state, random_pitch, realistic_take_swing)
+
+        self.assertEqual(state.outcomes, legacy_state.outcomes)
+        self.assertEqual(state.score, legacy_state.score)
+
+    def test_head_to_head_uses_identical_streams(self):
+        runs = [("v1", self.v1.sim_pitch, random_pitch, realistic_take_swing),
+                ("v2", self.v2.sim_pitch, rings, middle_swings)]
+        first = head_to_head(runs, sims=200, seed=4)
+        second = head_to_head(list(reversed(runs)), sims=200, seed=4)
+        self.assertEqual(first, second)
+        self.assertEqual(sum(first["v1"].values()), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
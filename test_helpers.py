@@ -0,0 +1,16 @@
+"""Helpers shared by the test modules."""
+from baseball2 import rings
+
+
+class InterruptingPitch():
+    """Pitches like rings, but raises after a fixed number of pitches to simulate a killed job."""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.calls = 0
+
+    def __call__(self, state):
+        self.calls += 1
+        if self.limit is not None and self.calls > self.limit:
+            raise KeyboardInterrupt
+        return rings(state)
@@ -0,0 +1,100 @@
+import os
+import random
+import tempfile
+import unittest
+from baseball2 import TeamStrategy, load_adapter, rings, smart_pitch, random_pitch, swing, middle_swings, realistic_take_swing
+from count_strategy import CountStrategy
+from league import League
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+
+
+class TestLeague(unittest.TestCase):
+
+    def setUp(self):
+        self.adapter = load_adapter(DEFAULT_ZONE, DEFAULT_OUTCOMES)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.tmpdir.name, "league.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_league(self, checkpoint_path=None):
+        league = League(self.adapter.sim_pitch, games_per_matchup=5, seed=7, checkpoint_path=checkpoint_path)
+        league.register("random", TeamStrategy(random_pitch, realistic_take_swing))
+        league.register("rings", TeamStrategy(rings, swing))
+        league.register("smart", TeamStrategy(smart_pitch, middle_swings))
+        return league
+
+    def test_round_robin_schedule(self):
+        league = self.make_league()
+        self.assertEqual(league.round_robin(), [("random", "rings"), ("random", "smart"), ("rings", "smart")])
+
+    def test_bracket_round_gives_top_seed_a_bye(self):
+        league = self.make_league()
+        pairs, bye = league.bracket_round(["a", "b", "c", "d", "e"])
+        self.assertEqual(bye, "a")
+        self.assertEqual(pairs, [("b", "e"), ("c", "d")])
+
+    def test_standings_and_matrix(self):
+        league = self.make_league()
+        league.run()
+        standings = league.standings()
+        self.assertEqual(sum(row["wins"] + row["losses"] + row["ties"] for row in standings), 3 * 5 * 2)
+        matrix = league.win_matrix()
+        for i in range(3):
+            self.assertIsNone(matrix[i][i])
+            for j in range(3):
+                if i != j:
+                    self.assertAlmostEqual(matrix[i][j] + matrix[j][i], 1.0)
+
+    def test_resume_from_checkpoint(self):
+        full = self.make_league().run()
+
+        partial = self.make_league(self.checkpoint_path)
+        partial.run([("random", "rings")])
+        resumed = self.make_league(self.checkpoint_path)
+        self.assertIn(("random", "rings"), resumed.results)
+        self.assertEqual(resumed.run(), full)
+
+    def test_checkpoint_rejects_changed_entry(self):
+        self.make_league(self.checkpoint_path).run([("random", "rings")])
+        league = League(self.adapter.sim_pitch, games_per_matchup=5, seed=7, checkpoint_path=self.checkpoint_path)
+        league.register("random", TeamStrategy(random_pitch, realistic_take_swing))
+        with self.assertRaises(ValueError):
+            league.register("rings", TeamStrategy(smart_pitch, swing))
+
+    def test_checkpoint_rejects_other_tables(self):
+        self.make_league(self.checkpoint_path).run([("random", "rings")])
+        ext_foul = load_adapter(DEFAULT_ZONE, "FakeBaseball 2/outcomes - ext foul.csv")
+        with self.assertRaises(ValueError):
+            League(ext_foul.sim_pitch, games_per_matchup=5, seed=7, checkpoint_path=self.checkpoint_path)
+
+    def test_checkpoint_rejects_other_strategy_table(self):
+        table = CountStrategy.load("FakeBaseball 2/realistic_take_swing.json")
+        league = League(self.adapter.sim_pitch, games_per_matchup=5, seed=7, checkpoint_path=self.checkpoint_path)
+        league.register("table", table.team_strategy())
+        league.register("rings", TeamStrategy(rings, swing))
+        league.run()
+
+        other = CountStrategy.from_dict(table.to_dict())
+        other.swing_probs[0][0] = 0.25
+        league = League(self.adapter.sim_pitch, games_per_matchup=5, seed=7, checkpoint_path=self.checkpoint_path)
+        with self.assertRaises(ValueError):
+            league.register("table", other.team_strategy())
+
+    def test_run_leaves_global_rng_alone(self):
+        random.seed(11)
+        expected = random.random()
+        random.seed(11)
+        self.make_league().run()
+        self.assertEqual(random.random(), expected)
+
+    def test_parallel_results_match_serial(self):
+        serial = self.make_league().run()
+        parallel = self.make_league().run(workers=2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(parallel), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
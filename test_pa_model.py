@@ -0,0 +1,68 @@
+import random
+import unittest
+from baseball2 import Baseball2PitchAdapter, pa_stats, rings, realistic_take_swing
+from count_strategy import CountStrategy
+from game_state import PAOutcome
+from pa_model import IncrementalEvaluator, batting_average, on_base_percentage
+from PitchOutcomes import PitchOutcome, OutcomeTable
+from sampler import Sampler
+from table_bundle import load_tables
+
+
+class TestIncrementalEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.zone, self.outcome_table = load_tables()
+        self.strategy = CountStrategy.load("FakeBaseball 2/realistic_take_swing.json")
+
+    def make_evaluator(self, outcome_table=None):
+        return IncrementalEvaluator(self.zone, outcome_table or self.outcome_table, self.strategy, self.strategy)
+
+    def test_rates_match_simulation(self):
+        rates = self.make_evaluator().rates()
+        self.assertAlmostEqual(sum(rates.values()), 1.0)
+
+        sims = 20000
+        random.seed(1)
+        counts = pa_stats(Baseball2PitchAdapter(self.zone, self.outcome_table).sim_pitch, rings, realistic_take_swing, sims, verbose=False)
+        for outcome in PAOutcome:
+            self.assertAlmostEqual(rates[outcome], counts[outcome] / sims, delta=0.01)
+
+    def test_edits_match_rebuilt_evaluator(self):
+        evaluator = self.make_evaluator()
+        edits = [(14, 14, PitchOutcome.HR), (14, 15, PitchOutcome.DOUBLE), (10, 14, PitchOutcome.FOUL), (20, 3, PitchOutcome.STRIKE)]
+        for row, col, outcome in edits:
+            evaluator.set_cell(row, col, outcome)
+
+        rows = [list(row) for row in self.outcome_table.outcome_table]
+        for row, col, outcome in edits:
+            rows[row][col] = outcome.value
+        rebuilt = self.make_evaluator(OutcomeTable(rows))
+
+        for outcome in PAOutcome:
+            self.assertAlmostEqual(evaluator.rates()[outcome], rebuilt.rates()[outcome])
+        self.assertAlmostEqual(evaluator.pitches_per_pa(), rebuilt.pitches_per_pa())
+        self.assertEqual(evaluator.table, rows)
+
+    def test_terminal_edit_moves_cell_weight(self):
+        evaluator = self.make_evaluator()
+        before = evaluator.rates()
+        weight = evaluator.cell_weight(14, 14)
+        self.assertGreater(weight, 0)
+        old = PAOutcome[PitchOutcome(evaluator.table[14][14]).name]
+        evaluator.set_cell(14, 14, PitchOutcome.TRIPLE)
+        after = evaluator.rates()
+        self.assertAlmostEqual(after[PAOutcome.TRIPLE] - before[PAOutcome.TRIPLE], weight)
+        self.assertAlmostEqual(before[old] - after[old], weight)
+        self.assertGreater(batting_average(after), batting_average(before) - 1e-12)
+        self.assertGreater(on_base_percentage(after), 0)
+
+    def test_pitches_always_fouled_raise(self):
+        rows = [[PitchOutcome.FOUL.value] * 29 for _ in range(29)]
+        strategy = CountStrategy.constant(Sampler([500]), Sampler([500]))
+        with self.assertRaises(ValueError):
+            IncrementalEvaluator(self.zone, OutcomeTable(rows), strategy, strategy)
+
+
+if __name__ == '__main__':
+    unittest.main()
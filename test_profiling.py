@@ -0,0 +1,50 @@
+import json
+import unittest
+import engine
+import baseball2
+from baseball2 import TeamStrategy, load_adapter, pa_stats, rings, middle_swings, swing
+from engine import sim_plate_appearance
+from game_state import GameState
+from PitchOutcomes import OutcomeTable
+from profiling import Profiler
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.adapter = load_adapter(DEFAULT_ZONE, DEFAULT_OUTCOMES)
+
+    def test_counts_are_consistent(self):
+        with Profiler() as profiler:
+            pa_stats(self.adapter.sim_pitch, rings, middle_swings, sims=200, verbose=False)
+        data = json.loads(profiler.to_json())
+        phases = data["phases"]
+        self.assertEqual(phases["sim_plate_appearance"]["calls"], 200)
+        self.assertEqual(phases["pitch_algo"]["calls"], phases["sim_pitch"]["calls"])
+        self.assertEqual(phases["state_transition"]["calls"], phases["sim_pitch"]["calls"])
+        self.assertEqual(data["callbacks"]["pitch_algo:rings"]["calls"], phases["sim_pitch"]["calls"])
+        self.assertAlmostEqual(data["pitches_per_pa"]["mean"], phases["sim_pitch"]["calls"] / 200)
+
+    def test_names_imported_before_install_are_profiled(self):
+        with Profiler() as profiler:
+            state = baseball2.sim_game(self.adapter.sim_pitch, TeamStrategy(rings, swing), TeamStrategy(rings, middle_swings))
+            for _ in range(50):
+                sim_plate_appearance(self.adapter.sim_pitch, GameState(), rings, middle_swings)
+        phases = profiler.to_dict()["phases"]
+        self.assertEqual(phases["sim_game"]["calls"], 1)
+        self.assertEqual(phases["sim_plate_appearance"]["calls"], state.pa_count + 50)
+        self.assertGreater(profiler.to_dict()["pitches_per_pa"]["mean"], 1.0)
+
+    def test_uninstall_restores_originals(self):
+        originals = (OutcomeTable.get_outcome, GameState.strike)
+        with Profiler():
+            self.assertIsNotNone(engine.profiler)
+            with self.assertRaises(RuntimeError):
+                Profiler().install()
+        self.assertIsNone(engine.profiler)
+        self.assertEqual((OutcomeTable.get_outcome, GameState.strike), originals)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+from sampler import Sampler, rect, ring, span
+
+
+class TestSampler(unittest.TestCase):
+
+    def test_rect_and_ring_indices(self):
+        self.assertEqual(rect(1, 2, 1, 2), [1, 2, 33, 34])
+        self.assertEqual(rect(16, 16, 9, 10), [272, 304])
+        self.assertEqual(sorted(ring(1, 3, 1, 3)), [1, 2, 3, 33, 35, 65, 66, 67])
+        self.assertEqual(span(3, 6), [3, 4, 5])
+
+    def test_alias_tables_match_weights(self):
+        sampler = Sampler([10, 20, 30, 40], [1, 2, 3, 4])
+        n = len(sampler.values)
+        implied = [sampler._prob[i] for i in range(n)]
+        for j in range(n):
+            if sampler._alias[j] != j:
+                implied[sampler._alias[j]] += 1 - sampler._prob[j]
+        for (value, prob), mass in zip(sampler.distribution(), implied):
+            self.assertAlmostEqual(mass / n, prob)
+
+    def test_from_regions_adds_overlaps(self):
+        sampler = Sampler.from_regions([([1, 2], 1), ([2, 3], 2)])
+        self.assertEqual(sampler.values, [1, 2, 3])
+        self.assertEqual(sampler.weights, [1, 3, 2])
+        self.assertFalse(sampler.uniform)
+
+    def test_uniform_sampler_draws_like_random_choice(self):
+        values = span(391, 610)
+        random.seed(8)
+        expected = [random.choice(values) for _ in range(50)]
+        random.seed(8)
+        sampler = Sampler(values)
+        self.assertEqual([sampler(None) for _ in range(50)], expected)
+
+    def test_draw_many_stays_in_support(self):
+        sampler = Sampler([5, 6, 7], [0, 1, 3])
+        draws = sampler.draw_many(2000)
+        self.assertEqual(len(draws), 2000)
+        self.assertNotIn(5, draws)
+        self.assertGreater(draws.count(7), draws.count(6))
+
+    def test_rejects_bad_weights(self):
+        with self.assertRaises(ValueError):
+            Sampler([1, 2], [0, 0])
+        with self.assertRaises(ValueError):
+            Sampler([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import baseball
+from baseball2 import rings_pool, middle_swings_pool
+from count_strategy import CountStrategy
+from game_state import PAOutcome
+from pa_model import IncrementalEvaluator
+from PitchOutcomes import PitchOutcome
+from sensitivity import cell_sensitivity, delta_sensitivity, runs_per_game
+from table_bundle import load_tables
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def test_runs_per_game_home_runs_only(self):
+        # Home runs before the third out follow a negative binomial with mean 3p / (1 - p)
+        p = 0.2
+        rates = {outcome: 0.0 for outcome in PAOutcome}
+        rates[PAOutcome.HR] = p
+        rates[PAOutcome.STRIKEOUT] = 1 - p
+        self.assertAlmostEqual(runs_per_game(rates), 9 * 3 * p / (1 - p))
+
+    def test_runs_per_game_needs_outs(self):
+        rates = {outcome: 0.0 for outcome in PAOutcome}
+        rates[PAOutcome.WALK] = 1.0
+        with self.assertRaises(ValueError):
+            runs_per_game(rates)
+
+    def test_cell_sensitivity_grid(self):
+        zone, outcome_table = load_tables()
+        strategy = CountStrategy.constant(rings_pool, middle_swings_pool)
+        evaluator = IncrementalEvaluator(zone, outcome_table, strategy, strategy)
+        rates_before = evaluator.rates()
+        grids = cell_sensitivity(evaluator, PitchOutcome.SINGLE)
+
+        self.assertEqual(len(grids["avg"]), 29)
+        self.assertEqual(len(grids["avg"][0]), 29)
+        for outcome, rate in evaluator.rates().items():
+            self.assertAlmostEqual(rate, rates_before[outcome])
+        for row in range(29):
+            for col in range(29):
+                outcome = PitchOutcome(outcome_table.outcome_table[row][col])
+                if grids["weight"][row][col] > 0 and outcome in (PitchOutcome.GB, PitchOutcome.PO):
+                    self.assertGreater(grids["avg"][row][col], 0)
+                    self.assertGreater(grids["runs_per_game"][row][col], 0)
+
+    def test_delta_sensitivity_restores_thresholds(self):
+        thresholds = dict(baseball.delta_table)
+        derivatives = delta_sensitivity(baseball.random_pitch, baseball.random_swing_no_take, sims=300)
+        self.assertEqual(baseball.delta_table, thresholds)
+        self.assertEqual(set(derivatives), set(thresholds) - {"doubleplay"})
+        self.assertGreaterEqual(derivatives["single"]["avg"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
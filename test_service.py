@@ -0,0 +1,150 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import unittest
+from baseball2 import load_adapter
+from service import SimulationService, normalize_job
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+
+
+async def request(port, method, path, data=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(data).encode() if data is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, [json.loads(line) for line in payload.splitlines() if line]
+
+
+class TestSimulationService(unittest.TestCase):
+
+    def test_normalize_job_fills_defaults_and_validates(self):
+        job = normalize_job({"pitch": "rings", "swing": "middle_swings"})
+        self.assertEqual(job["kind"], "pa_stats")
+        self.assertEqual(job["sims"], 10000)
+        with self.assertRaises(ValueError):
+            normalize_job({"pitch": "rings", "swing": "not_a_strategy"})
+        with self.assertRaises(ValueError):
+            normalize_job({"kind": "games", "team_a": {"pitch": "rings", "swing": "swing"}})
+        with self.assertRaises(ValueError):
+            normalize_job({"pitch": ["rings"], "swing": "swing"})
+        with self.assertRaises(ValueError):
+            normalize_job({"pitch": "rings", "swing": "swing", "zone": "nope.csv"})
+        with self.assertRaises(ValueError):
+            normalize_job({"pitch": "rings", "swing": "swing", "outcomes": 5})
+
+    def test_edited_tables_are_a_new_job(self):
+        with tempfile.TemporaryDirectory() as directory:
+            outcomes_path = shutil.copy(DEFAULT_OUTCOMES, directory)
+            spec = {"pitch": "rings", "swing": "swing", "outcomes": outcomes_path}
+            job = normalize_job(spec)
+            adapter = load_adapter(DEFAULT_ZONE, outcomes_path)
+            self.assertIs(load_adapter(DEFAULT_ZONE, outcomes_path), adapter)
+
+            with open(outcomes_path, 'r') as file:
+                edited = file.read().replace("7", "4", 1)
+            with open(outcomes_path, 'w') as file:
+                file.write(edited)
+            self.assertNotEqual(normalize_job(spec), job)
+            reloaded = load_adapter(DEFAULT_ZONE, outcomes_path)
+            self.assertIsNot(reloaded, adapter)
+            self.assertEqual(reloaded.outcome_table.outcome_table[0][0], 4)
+
+    def test_jobs_are_deduplicated_and_streamed(self):
+        async def scenario():
+            service = SimulationService(workers=1)
+            server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                spec = {"pitch": "rings", "swing": "middle_swings", "sims": 6000, "seed": 1}
+                status, (first,) = await request(port, "POST", "/jobs", spec)
+                self.assertEqual(status, 202)
+                _, (second,) = await request(port, "POST", "/jobs", dict(spec))
+                self.assertEqual(first["id"], second["id"])
+
+                _, events = await request(port, "GET", f"/jobs/{first['id']}/events")
+                self.assertEqual(events[-1]["status"], "done")
+                self.assertEqual(sum(events[-1]["result"].values()), 6000)
+
+                status, (cached,) = await request(port, "POST", "/jobs", spec)
+                self.assertEqual(status, 200)
+                self.assertEqual(cached["result"], events[-1]["result"])
+
+                status, (error,) = await request(port, "POST", "/jobs", {"pitch": "nope", "swing": "swing"})
+                self.assertEqual(status, 400)
+                status, _ = await request(port, "POST", "/jobs", {"pitch": ["rings"], "swing": "swing"})
+                self.assertEqual(status, 400)
+                status, _ = await request(port, "POST", "/jobs", {"pitch": "rings", "swing": "swing", "zone": "nope.csv"})
+                self.assertEqual(status, 400)
+                status, _ = await request(port, "GET", "/jobs/999")
+                self.assertEqual(status, 404)
+            finally:
+                server.close()
+                await server.wait_closed()
+                service.pool.shutdown()
+
+        asyncio.run(scenario())
+
+    def test_finished_jobs_are_bounded_and_bad_requests_rejected(self):
+        async def scenario():
+            service = SimulationService(workers=1, max_finished=1)
+            server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                first_spec = {"pitch": "rings", "swing": "swing", "sims": 100}
+                _, (first,) = await request(port, "POST", "/jobs", first_spec)
+                await request(port, "GET", f"/jobs/{first['id']}/events")
+                _, (second,) = await request(port, "POST", "/jobs", dict(first_spec, seed=1))
+                await request(port, "GET", f"/jobs/{second['id']}/events")
+                status, _ = await request(port, "GET", f"/jobs/{first['id']}")
+                self.assertEqual(status, 404)
+                _, (again,) = await request(port, "POST", "/jobs", first_spec)
+                self.assertNotEqual(again["id"], first["id"])
+
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /jobs HTTP/1.1\r\nContent-Length: 50\r\n\r\n{}")
+                writer.write_eof()
+                response = await reader.read()
+                writer.close()
+                self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+            finally:
+                server.close()
+                await server.wait_closed()
+                service.pool.shutdown()
+
+        asyncio.run(scenario())
+
+    def test_broken_pool_is_replaced(self):
+        async def scenario():
+            service = SimulationService(workers=1)
+            try:
+                job = await service.submit({"pitch": "rings", "swing": "swing", "sims": 100})
+                while not job.finished:
+                    await job.wait_for_change(job.version)
+                broken = service.pool
+                # A worker killed from outside, like by the OOM killer
+                for process in list(broken._processes.values()):
+                    process.kill()
+
+                job = await service.submit({"pitch": "rings", "swing": "swing", "sims": 100, "seed": 1})
+                while not job.finished:
+                    await job.wait_for_change(job.version)
+                self.assertEqual(job.status, "failed")
+                self.assertIsNot(service.pool, broken)
+
+                job = await service.submit({"pitch": "rings", "swing": "swing", "sims": 100, "seed": 1})
+                while not job.finished:
+                    await job.wait_for_change(job.version)
+                self.assertEqual(job.status, "done")
+            finally:
+                service.pool.shutdown()
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import unittest
+from baseball2 import TeamStrategy, load_adapter, rings, swing, smart_pitch, realistic_take_swing
+from engine import sim_game, sim_games
+from game_state import PAOutcome
+from stats import StatBook
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES
+from test_helpers import InterruptingPitch
+
+
+class TestStatBook(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_pitch = load_adapter(DEFAULT_ZONE, DEFAULT_OUTCOMES).sim_pitch
+        self.names = [f"player {i}" for i in range(18)]
+        self.home = TeamStrategy(rings, swing, lineup=list(range(9)))
+        self.away = TeamStrategy(smart_pitch, realistic_take_swing, lineup=list(range(9, 18)))
+
+    def test_record_and_line(self):
+        book = StatBook(["a", "b"])
+        book.record_pa(0, PAOutcome.HR, 2, 4)
+        book.record_pa(0, PAOutcome.WALK, 0, 5)
+        book.record_pa(0, PAOutcome.STRIKEOUT, 0, 3)
+        line = book.line(0)
+        self.assertEqual((line["PA"], line["H"], line["HR"], line["BB"], line["K"], line["RBI"], line["P"]),
+                         (3, 1, 1, 1, 1, 2, 12))
+        self.assertAlmostEqual(line["AVG"], 0.5)
+        self.assertEqual(book.line(1)["PA"], 0)
+
+        season = StatBook(["a", "b"])
+        season.add(book)
+        season.add(book)
+        self.assertEqual(season.line(0)["RBI"], 4)
+        with self.assertRaises(ValueError):
+            season.add(StatBook(["a"]))
+
+    def test_game_totals_match_state(self):
+        box = StatBook(self.names)
+        random.seed(2)
+        state = sim_game(self.sim_pitch, self.home, self.away, stats=box)
+        self.assertEqual(sum(box.stats["PA"]), state.pa_count)
+        self.assertEqual(sum(box.stats["RBI"]), sum(state.score))
+        self.assertEqual(sum(box.stats["BB"]), state.outcomes[PAOutcome.WALK])
+        self.assertEqual(state.batting_order, [sum(box.stats["PA"][9:]), sum(box.stats["PA"][:9])])
+
+    def test_lineups_dont_change_results(self):
+        random.seed(3)
+        expected = sim_game(self.sim_pitch, TeamStrategy(rings, swing), TeamStrategy(smart_pitch, realistic_take_swing))
+        random.seed(3)
+        state = sim_game(self.sim_pitch, self.home, self.away, stats=StatBook(self.names))
+        self.assertEqual(state.score, expected.score)
+
+    def test_season_checkpoint_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "season.json")
+            season = StatBook(self.names)
+            home = TeamStrategy(InterruptingPitch(), swing, lineup=self.home.lineup)
+            random.seed(5)
+            expected = sim_games(self.sim_pitch, 20, home, self.away, verbose=False, stats=season)
+
+            # Killed part way through the season, after some games were checkpointed
+            random.seed(5)
+            killed = TeamStrategy(InterruptingPitch(limit=1500), swing, lineup=self.home.lineup)
+            with self.assertRaises(KeyboardInterrupt):
+                sim_games(self.sim_pitch, 20, killed, self.away, verbose=False, stats=StatBook(self.names),
+                          checkpoint_path=path, checkpoint_interval=0.0)
+
+            resumed = StatBook(self.names)
+            home = TeamStrategy(InterruptingPitch(), swing, lineup=self.home.lineup)
+            totals = sim_games(self.sim_pitch, 20, home, self.away, verbose=False, stats=resumed,
+                               checkpoint_path=path, resume=True)
+            self.assertEqual(totals, expected)
+            self.assertEqual(resumed.columns(), season.columns())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from PitchOutcomes import parse_outcomes_csv
+from table_bundle import DEFAULT_ZONE, DEFAULT_OUTCOMES, build_bundle, load_bundle, load_tables
+from Zone import parse_zone_csv
+
+
+class TestTableBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.zone_path = shutil.copy(DEFAULT_ZONE, self.directory)
+        self.outcomes_path = shutil.copy(DEFAULT_OUTCOMES, self.directory)
+        self.bundle_path = os.path.join(self.directory, "tables.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shipped_bundle_matches_csvs(self):
+        tables = load_bundle()
+        self.assertIsNotNone(tables, "Rebuild the default bundle with python table_bundle.py")
+        self.assertEqual(tables, (parse_zone_csv(DEFAULT_ZONE), parse_outcomes_csv(DEFAULT_OUTCOMES)))
+
+    def test_round_trip(self):
+        build_bundle(self.zone_path, self.outcomes_path, self.bundle_path)
+        zone_table, outcome_table = load_bundle(self.bundle_path, self.zone_path, self.outcomes_path)
+        self.assertEqual(zone_table, parse_zone_csv(self.zone_path))
+        self.assertEqual(outcome_table, parse_outcomes_csv(self.outcomes_path))
+
+    def test_touched_but_unchanged_source_is_fresh(self):
+        build_bundle(self.zone_path, self.outcomes_path, self.bundle_path)
+        os.utime(self.zone_path, ns=(0, 0))
+        self.assertIsNotNone(load_bundle(self.bundle_path, self.zone_path, self.outcomes_path))
+
+    def test_crlf_checkout_is_fresh(self):
+        build_bundle(self.zone_path, self.outcomes_path, self.bundle_path)
+        with open(self.zone_path, 'rb') as file:
+            data = file.read()
+        with open(self.zone_path, 'wb') as file:
+            file.write(data.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n"))
+        self.assertIsNotNone(load_bundle(self.bundle_path, self.zone_path, self.outcomes_path))
+
+    def test_stale_or_corrupt_bundle_falls_back_to_csv(self):
+        build_bundle(self.zone_path, self.outcomes_path, self.bundle_path)
+        with open(self.outcomes_path, 'r') as file:
+            edited = file.read().replace("7", "4", 1)
+        with open(self.outcomes_path, 'w') as file:
+            file.write(edited)
+        self.assertIsNone(load_bundle(self.bundle_path, self.zone_path, self.outcomes_path))
+        _, outcome_table = load_tables(self.zone_path, self.outcomes_path, self.bundle_path)
+        self.assertEqual(outcome_table.outcome_table, parse_outcomes_csv(self.outcomes_path))
+
+        build_bundle(self.zone_path, self.outcomes_path, self.bundle_path)
+        with open(self.bundle_path, 'r+b') as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b"\xff")
+        self.assertIsNone(load_bundle(self.bundle_path, self.zone_path, self.outcomes_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
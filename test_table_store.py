@@ -0,0 +1,79 @@
+import random
+import unittest
+from baseball2 import Baseball2PitchAdapter, TeamStrategy, rings, swing, smart_pitch, realistic_take_swing
+from engine import sim_game
+from game_state import GameState
+from table_store import CompiledMatchup, LineupPitchAdapter, TableStore
+from table_bundle import load_tables
+from Zone import Zone
+
+
+class TestTableStore(unittest.TestCase):
+
+    def setUp(self):
+        self.zone, self.outcome_table = load_tables()
+        self.store = TableStore(self.zone, self.outcome_table, max_compiled=2)
+
+    def test_compiled_matches_outcome_table(self):
+        compiled = CompiledMatchup(self.zone, self.outcome_table)
+        random.seed(0)
+        for _ in range(2000):
+            pitch = random.randint(1, 1024)
+            swing_index = random.choice([-1, random.randint(1, 1024)])
+            self.assertEqual(compiled.resolve(pitch, swing_index), self.outcome_table.get_outcome(self.zone, pitch, swing_index))
+
+    def test_tables_are_interned(self):
+        copy = self.store.load_outcome_table("FakeBaseball 2/outcomes.csv")
+        self.assertIs(copy, self.store.default_outcome_table)
+        ext_foul = self.store.load_outcome_table("FakeBaseball 2/outcomes - ext foul.csv")
+        self.assertIsNot(ext_foul, copy)
+
+    def test_matchup_resolution_and_eviction(self):
+        ext_foul = self.store.load_outcome_table("FakeBaseball 2/outcomes - ext foul.csv")
+        pitcher = self.store.player("pitcher")
+        plain = self.store.player("plain")
+        slugger = self.store.player("slugger", outcome_table=ext_foul)
+        ext_pitcher = self.store.player("ext pitcher", outcome_table=ext_foul)
+
+        default = self.store.matchup(pitcher, plain)
+        self.assertIs(self.store.matchup(pitcher, plain), default)
+        self.assertIs(self.store.matchup(pitcher, slugger), self.store.matchup(ext_pitcher, plain))
+        self.assertEqual(self.store.matchup(pitcher, slugger).rows, len(ext_foul.outcome_table))
+
+        other_zone = self.store.intern_zone(Zone([[0] * 32 for _ in range(32)]))
+        self.store.matchup(pitcher, self.store.player("blind", zone=other_zone))
+        # default pairing was least recently used and has been evicted
+        self.assertIsNot(self.store.matchup(pitcher, plain), default)
+
+    def test_single_table_lineup_matches_adapter(self):
+        players = [self.store.player(f"player {i}") for i in range(20)]
+        lineup_adapter = LineupPitchAdapter(self.store, players)
+        home = TeamStrategy(rings, swing, lineup=list(range(9)), pitcher=9)
+        away = TeamStrategy(smart_pitch, realistic_take_swing, lineup=list(range(10, 19)), pitcher=19)
+
+        random.seed(4)
+        expected = sim_game(Baseball2PitchAdapter(self.zone, self.outcome_table).sim_pitch, home, away)
+        random.seed(4)
+        state = sim_game(lineup_adapter.sim_pitch, home, away)
+        self.assertEqual(state.score, expected.score)
+        self.assertEqual(sum(state.batting_order), state.pa_count)
+
+    def test_lineup_uses_batter_tables(self):
+        ext_foul = self.store.load_outcome_table("FakeBaseball 2/outcomes - ext foul.csv")
+        players = [self.store.player("pitcher"), self.store.player("slugger", outcome_table=ext_foul)]
+        lineup_adapter = LineupPitchAdapter(self.store, players)
+        state = GameState([[1], [1]], pitchers=[0, 0])
+        lineup_adapter.sim_pitch(state, lambda state: 500, lambda state: 500)
+        self.assertIs(lineup_adapter._matchup.outcome_table, ext_foul)
+
+    def test_lineup_needs_lineups_and_pitchers(self):
+        lineup_adapter = LineupPitchAdapter(self.store, [self.store.player(f"player {i}") for i in range(20)])
+        home = TeamStrategy(rings, swing, lineup=list(range(9)), pitcher=9)
+        for away in (TeamStrategy(smart_pitch, realistic_take_swing, lineup=list(range(10, 19))),
+                     TeamStrategy(smart_pitch, realistic_take_swing, pitcher=19)):
+            with self.assertRaises(ValueError):
+                sim_game(lineup_adapter.sim_pitch, home, away)
+
+
+if __name__ == '__main__':
+    unittest.main()